@@ -18,10 +18,67 @@ import unicodedata
 import re
 import os
 import json
+import functools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from html import escape as html_escape
+from operator import itemgetter
+
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Levenshtein
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    # Fall back to the pure-Python implementation below
+    rf_process = None
+    Levenshtein = None
+    HAS_RAPIDFUZZ = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    # Optional - Flask's jsonify is used when orjson is not installed
+    orjson = None
+    HAS_ORJSON = False
+
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    # Optional - msgpack.unpackb is used when msgspec is not installed
+    msgspec = None
+    HAS_MSGSPEC = False
+
+try:
+    import numpy as np
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    # Optional - only used when rapidfuzz is not installed
+    np = None
+    njit = None
+    HAS_NUMBA = False
 
 app = Flask(__name__)
 CORS(app)
 
+
+def json_response(payload, status=200):
+    """
+    jsonify replacement that serializes with orjson when it is
+    installed (3-10x faster, emits bytes directly) and falls back to
+    Flask's encoder otherwise.
+    """
+    if HAS_ORJSON:
+        return app.response_class(orjson.dumps(payload), status=status,
+                                  mimetype='application/json')
+
+    response = jsonify(payload)
+    response.status_code = status
+    return response
+
+
 # Global variables for trie and lookup data
 trie = None
 lookup = None
@@ -36,78 +93,228 @@ LCCN_PREFIX_MAP = {
     '6': 'n'
 }
 
+# Index by first digit of the compact LCCN - no dict hash or .get per
+# call. Digits outside the known map fall through to the default.
+_LCCN_PREFIX_TABLE = [None] * 10
+for _digit, _prefix in LCCN_PREFIX_MAP.items():
+    _LCCN_PREFIX_TABLE[int(_digit)] = _prefix
+
+# Shared pool for scoring the queries of a POST batch in parallel
+_QUERY_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+
 # Service configuration
 SERVICE_BASE_URL = "http://localhost:5724"
 SERVICE_NAME = "LCNAF Reconciliation Service"
 SERVICE_VERSION = "0.2"
 
+# Static /preview markup, built once - only the two fields vary per hit
+_PREVIEW_TEMPLATE = """
+    <html>
+    <head>
+        <style>
+            body {{
+                font-family: Arial, sans-serif;
+                padding: 10px;
+                font-size: 12px;
+            }}
+            .lccn-link {{
+                color: #0066cc;
+                text-decoration: none;
+                font-weight: bold;
+            }}
+            .lccn-link:hover {{
+                text-decoration: underline;
+            }}
+        </style>
+    </head>
+    <body>
+        <div>
+            <strong>LCCN:</strong> <a href="{entity_id}" target="_blank" class="lccn-link">{lccn}</a>
+        </div>
+        <div style="margin-top: 10px; font-size: 11px; color: #666;">
+            Click to view full record at id.loc.gov
+        </div>
+    </body>
+    </html>
+    """
+
+# Built once at import - normalize_string runs on every query
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation)
+# ASCII uppercase -> lowercase for bytes.translate
+_BYTES_LOWER = bytes.maketrans(bytes(range(65, 91)), bytes(range(97, 123)))
+
 
 def normalize_string(name):
     """
     Normalize string exactly like the create_trie.py script does.
+    After the unicode fold the pipeline stays in bytes: one translate
+    call lowercases and strips spaces, and the sort runs on raw byte
+    values, avoiding a chain of intermediate str objects.
     """
     # Remove punctuation
-    norm = name.translate(str.maketrans('', '', string.punctuation))
+    norm = name.translate(_PUNCT_TABLE)
 
     # Normalize unicode (NFKD) and remove non-ASCII
-    norm = unicodedata.normalize('NFKD', norm).encode('ascii', 'ignore').decode('utf-8')
+    norm_bytes = unicodedata.normalize('NFKD', norm).encode('ascii', 'ignore')
+
+    # Lowercase and remove spaces in a single pass, then sort
+    norm_bytes = bytes(sorted(norm_bytes.translate(_BYTES_LOWER, delete=b' ')))
+
+    # Move non-letter characters to the end (the bytes are sorted, so
+    # everything before the first a-z byte is the non-letter prefix)
+    first_letter_index = next(
+        (i for i, c in enumerate(norm_bytes) if 0x61 <= c <= 0x7a), 0
+    )
+    if first_letter_index:
+        norm_bytes = norm_bytes[first_letter_index:] + norm_bytes[:first_letter_index]
+
+    return norm_bytes.decode('ascii')
+
+
+def normalize_label(label):
+    """Reduce a label to its comparison form: lowercase, alphanumeric only."""
+    return ''.join(c for c in label.lower() if c.isalnum())
+
+
+def myers_distance(s1, s2):
+    """
+    Bit-parallel Levenshtein distance (Myers/Hyyro algorithm).
+    Requires len(s1) <= 64 so the pattern fits in one machine word.
+    """
+    m = len(s1)
+
+    if m == 0:
+        return len(s2)
 
-    # Convert to lowercase
-    norm = norm.lower()
+    # Per-character bitmask of positions in the pattern
+    peq = {}
+    for i, ch in enumerate(s1):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
 
-    # Remove spaces
-    norm = norm.replace(' ', '')
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
 
-    # Sort characters
-    norm = ''.join(sorted(norm))
+    vp = full
+    vn = 0
+    score = m
 
-    # Move non-letter characters to the end
-    try:
-        match = re.search(r"[a-z]", norm)
-        if match:
-            first_letter_index = match.start()
-            first_part = norm[:first_letter_index]
-            second_part = norm[first_letter_index:]
-            norm = second_part + first_part
-    except:
-        pass
+    for ch in s2:
+        eq = peq.get(ch, 0)
+        d0 = ((((eq & vp) + vp) & full) ^ vp) | eq | vn
+        hp = vn | (~(d0 | vp) & full)
+        hn = vp & d0
 
-    return norm
+        if hp & last:
+            score += 1
+        if hn & last:
+            score -= 1
 
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(d0 | hp) & full)
+        vn = hp & d0
+
+    return score
+
+
+def levenshtein_distance(s1, s2, score_cutoff=None):
+    """
+    Calculate Levenshtein distance between two strings.
+    Uses the bit-parallel Myers algorithm when either string fits in a
+    64-bit word, falling back to the full DP matrix otherwise.
+    A score_cutoff aborts early, returning score_cutoff + 1.
+    """
+    # The length difference is a lower bound on the distance
+    if score_cutoff is not None and abs(len(s1) - len(s2)) > score_cutoff:
+        return score_cutoff + 1
+
+    if len(s1) <= 64:
+        return myers_distance(s1, s2)
+    if len(s2) <= 64:
+        return myers_distance(s2, s1)
 
-def levenshtein_distance(s1, s2):
-    """Calculate Levenshtein distance between two strings."""
     len1 = len(s1)
     len2 = len(s2)
 
-    matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
+    # Keep the row buffers as short as possible
+    if len2 > len1:
+        s1, s2 = s2, s1
+        len1, len2 = len2, len1
 
-    for i in range(len1 + 1):
-        matrix[i][0] = i
-    for j in range(len2 + 1):
-        matrix[0][j] = j
+    # Rolling two-row buffers - only the previous row is ever read, so
+    # the full DP matrix is never materialized
+    prev = list(range(len2 + 1))
+    curr = [0] * (len2 + 1)
 
     for i in range(1, len1 + 1):
+        curr[0] = i
+        c1 = s1[i - 1]
+
         for j in range(1, len2 + 1):
-            cost = 0 if s1[i - 1] == s2[j - 1] else 1
-            matrix[i][j] = min(
-                matrix[i - 1][j] + 1,
-                matrix[i][j - 1] + 1,
-                matrix[i - 1][j - 1] + cost
+            cost = 0 if c1 == s2[j - 1] else 1
+            curr[j] = min(
+                prev[j] + 1,
+                curr[j - 1] + 1,
+                prev[j - 1] + cost
             )
 
-    return matrix[len1][len2]
+        # Give up once no path can beat the cutoff
+        if score_cutoff is not None and min(curr) > score_cutoff:
+            return score_cutoff + 1
+
+        prev, curr = curr, prev
+
+    return prev[len2]
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _levenshtein_kernel(a, b):
+        """Rolling one-row Levenshtein over codepoint arrays, JIT-compiled."""
+        n = b.shape[0]
+        row = np.arange(n + 1, dtype=np.int32)
+
+        for i in range(a.shape[0]):
+            diag = row[0]
+            row[0] = i + 1
+            ca = a[i]
+
+            for j in range(n):
+                cost = diag if ca == b[j] else diag + 1
+                diag = row[j + 1]
+                row[j + 1] = min(row[j + 1] + 1, row[j] + 1, cost)
+
+        return int(row[n])
+
+    def _encode_codepoints(s):
+        """Encode a string as an int32 codepoint array for the JIT kernel."""
+        return np.fromiter(map(ord, s), dtype=np.int32, count=len(s))
 
 
-def calculate_match_score(original_input, label, distance):
+def string_distance(s1, s2, score_cutoff=None):
     """
-    Calculate a match score (0-100) based on Levenshtein distance.
-    Higher score = better match.
+    Levenshtein distance between two strings.
+    Uses RapidFuzz's C implementation when available, then a Numba-JIT
+    kernel if installed, then pure Python. A score_cutoff aborts the
+    computation once the distance is known to exceed it, returning
+    score_cutoff + 1.
     """
-    # Normalize both for comparison
-    normalized_input = ''.join(c for c in original_input.lower() if c.isalnum())
-    normalized_label = ''.join(c for c in label.lower() if c.isalnum())
+    if HAS_RAPIDFUZZ:
+        return Levenshtein.distance(s1, s2, score_cutoff=score_cutoff)
+
+    if HAS_NUMBA:
+        if score_cutoff is not None and abs(len(s1) - len(s2)) > score_cutoff:
+            return score_cutoff + 1
+        return _levenshtein_kernel(_encode_codepoints(s1), _encode_codepoints(s2))
+
+    return levenshtein_distance(s1, s2, score_cutoff=score_cutoff)
+
 
+def calculate_match_score(normalized_input, normalized_label, distance):
+    """
+    Calculate a match score (0-100) based on Levenshtein distance.
+    Takes the precomputed comparison forms. Higher score = better match.
+    """
     max_len = max(len(normalized_input), len(normalized_label))
     if max_len == 0:
         return 100
@@ -123,10 +330,9 @@ def convert_lccn(numeric_lccn):
         return numeric_lccn
 
     lccn_str = str(numeric_lccn)
-    first_digit = lccn_str[0]
+    prefix = _LCCN_PREFIX_TABLE[ord(lccn_str[0]) - 48]
 
-    prefix = LCCN_PREFIX_MAP.get(first_digit)
-    if not prefix:
+    if prefix is None:
         return f"n{lccn_str.zfill(8)}"
 
     return prefix + lccn_str[1:]
@@ -136,7 +342,16 @@ def reconcile_name(query_text):
     """
     Reconcile a name against LCNAF.
     Returns a list of candidates sorted by match quality.
+    OpenRefine batches repeat the same names heavily, so results are
+    memoized per query text; candidates are copied on the way out so
+    callers cannot mutate the cached entries.
     """
+    return [dict(candidate) for candidate in _reconcile_name_cached(query_text)]
+
+
+@functools.lru_cache(maxsize=100_000)
+def _reconcile_name_cached(query_text):
+    """Uncached reconciliation - see reconcile_name."""
     # Normalize the query
     normalized = normalize_string(query_text)
 
@@ -151,18 +366,31 @@ def reconcile_name(query_text):
 
     candidates = []
 
-    if isinstance(lccn_data, list):
+    if isinstance(lccn_data, tuple):
         # Multiple labels map to this normalized form
+        # (lccns, labels, normalized_labels struct-of-arrays)
         # Calculate distance for each and return all
-        normalized_input = ''.join(c for c in query_text.lower() if c.isalnum())
-
-        for item in lccn_data:
-            lccn_num = item[0]
-            label = item[1]
-
-            normalized_label = ''.join(c for c in label.lower() if c.isalnum())
-            distance = levenshtein_distance(normalized_input, normalized_label)
-            score = calculate_match_score(query_text, label, distance)
+        lccns, labels, norms = lccn_data
+        normalized_input = normalize_label(query_text)
+
+        if HAS_RAPIDFUZZ:
+            # Score the whole bucket in one C call; workers=-1 spreads
+            # large buckets across threads
+            distances = rf_process.cdist(
+                [normalized_input], norms,
+                scorer=Levenshtein.distance, workers=-1
+            )[0]
+        else:
+            distances = [
+                string_distance(normalized_input, norm)
+                for norm in norms
+            ]
+
+        for lccn_num, label, normalized_label, distance in zip(
+                lccns, labels, norms, distances):
+            # cdist hands back numpy ints - keep the JSON layer happy
+            distance = int(distance)
+            score = calculate_match_score(normalized_input, normalized_label, distance)
 
             lccn_formatted = convert_lccn(lccn_num)
 
@@ -175,7 +403,7 @@ def reconcile_name(query_text):
             })
 
         # Sort by score (highest first)
-        candidates.sort(key=lambda x: x['score'], reverse=True)
+        candidates.sort(key=itemgetter('score'), reverse=True)
 
     else:
         # Single LCCN value
@@ -203,18 +431,34 @@ def load_data():
     print(f"Loading trie from: {trie_path}")
     print(f"Loading lookup from: {lookup_path}")
 
-    # Load and decompress trie
-    with open(trie_path, 'rb') as f:
-        trie_compressed = f.read()
+    trie = marisa_trie.Trie()
+
+    # A pre-decompressed sidecar (`gunzip -k trie.marisa.bin` renamed to
+    # trie.marisa at deploy time) can be mmapped by every worker
+    # directly - one physical copy in the page cache no matter how many
+    # workers run. Otherwise decompress into an unlinked temp file.
+    sidecar_path = os.path.join(os.path.dirname(trie_path), 'trie.marisa')
+
+    if os.path.exists(sidecar_path):
+        print(f"Using pre-decompressed trie: {sidecar_path}")
+        trie.mmap(sidecar_path)
+    else:
+        with open(trie_path, 'rb') as f:
+            trie_compressed = f.read()
 
-    trie_data = gzip.decompress(trie_compressed)
+        trie_data = gzip.decompress(trie_compressed)
 
-    temp_trie_path = '/tmp/trie_temp_openrefine.marisa'
-    with open(temp_trie_path, 'wb') as f:
-        f.write(trie_data)
+        # Write to a temp file and memory-map it rather than trie.load() -
+        # the trie then lives in the page cache instead of anonymous heap,
+        # and the mapping survives unlinking the file
+        with tempfile.NamedTemporaryFile(suffix='.marisa', delete=False) as f:
+            f.write(trie_data)
+            temp_trie_path = f.name
 
-    trie = marisa_trie.Trie()
-    trie.load(temp_trie_path)
+        del trie_data
+
+        trie.mmap(temp_trie_path)
+        os.unlink(temp_trie_path)
 
     print(f"Trie loaded: {len(trie):,} keys")
 
@@ -223,11 +467,35 @@ def load_data():
         lookup_compressed = f.read()
 
     lookup_data = gzip.decompress(lookup_compressed)
-    lookup = msgpack.unpackb(lookup_data, raw=False)
+
+    # msgspec's C decoder is several times faster than msgpack.unpackb
+    # on the multi-million entry list and allocates less along the way
+    if HAS_MSGSPEC:
+        lookup = msgspec.msgpack.decode(lookup_data)
+    else:
+        lookup = msgpack.unpackb(lookup_data, raw=False)
 
     print(f"Lookup loaded: {len(lookup):,} entries")
 
-    os.remove(temp_trie_path)
+    # Convert multi-label buckets to a struct-of-arrays layout:
+    # (lccns, labels, normalized_labels) parallel tuples instead of a
+    # two-element Python list per label. Far fewer objects per bucket,
+    # and rapidfuzz can consume whole columns directly. In-memory only:
+    # the on-disk msgpack keeps the [lccn, label] shape shared with the
+    # JavaScript tools.
+    for i, entry in enumerate(lookup):
+        if isinstance(entry, list):
+            lookup[i] = (
+                tuple(item[0] for item in entry),
+                tuple(item[1] for item in entry),
+                tuple(normalize_label(item[1]) for item in entry),
+            )
+
+    print("Normalized label cache built")
+
+    # Pay the one-time JIT compile cost at startup, not on the first query
+    if HAS_NUMBA and not HAS_RAPIDFUZZ:
+        string_distance('numba', 'warmup')
 
 
 # OpenRefine Reconciliation API Endpoints
@@ -235,7 +503,7 @@ def load_data():
 @app.route('/')
 def index():
     """Root endpoint - returns service information."""
-    return jsonify({
+    return json_response({
         'name': SERVICE_NAME,
         'version': SERVICE_VERSION,
         'identifierSpace': 'http://id.loc.gov/authorities/names/',
@@ -274,38 +542,45 @@ def reconcile():
                 'height': 100
             }
         }
-        return jsonify(manifest)
+        return json_response(manifest)
 
     if request.method == 'POST':
         # Process reconciliation queries
         queries_json = request.form.get('queries')
 
         if not queries_json:
-            return jsonify({'error': 'No queries provided'}), 400
+            return json_response({'error': 'No queries provided'}, 400)
 
         try:
-            queries = json.loads(queries_json)
-        except json.JSONDecodeError:
-            return jsonify({'error': 'Invalid JSON in queries'}), 400
+            if HAS_ORJSON:
+                queries = orjson.loads(queries_json)
+            else:
+                queries = json.loads(queries_json)
+        except (json.JSONDecodeError, ValueError):
+            return json_response({'error': 'Invalid JSON in queries'}, 400)
 
+        # Queries in a batch are independent, so reconcile them in
+        # parallel - rapidfuzz releases the GIL while scoring, and
+        # repeats land in the (thread-safe) lru_cache
         results = {}
+        futures = {}
 
         for query_id, query_data in queries.items():
             if isinstance(query_data, dict) and 'query' in query_data:
-                query_text = query_data['query']
-
-                # Reconcile the query
-                candidates = reconcile_name(query_text)
-
-                results[query_id] = {
-                    'result': candidates
-                }
+                futures[query_id] = _QUERY_POOL.submit(
+                    reconcile_name, query_data['query']
+                )
             else:
                 results[query_id] = {
                     'result': []
                 }
 
-        return jsonify(results)
+        for query_id, future in futures.items():
+            results[query_id] = {
+                'result': future.result()
+            }
+
+        return json_response(results)
 
 
 @app.route('/view')
@@ -330,53 +605,27 @@ def preview():
     # Extract LCCN from the URL
     lccn = entity_id.split('/')[-1] if '/' in entity_id else entity_id
 
-    html = f"""
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                padding: 10px;
-                font-size: 12px;
-            }}
-            .lccn-link {{
-                color: #0066cc;
-                text-decoration: none;
-                font-weight: bold;
-            }}
-            .lccn-link:hover {{
-                text-decoration: underline;
-            }}
-        </style>
-    </head>
-    <body>
-        <div>
-            <strong>LCCN:</strong> <a href="{entity_id}" target="_blank" class="lccn-link">{lccn}</a>
-        </div>
-        <div style="margin-top: 10px; font-size: 11px; color: #666;">
-            Click to view full record at id.loc.gov
-        </div>
-    </body>
-    </html>
-    """
-
-    return html
+    # Escaping also keeps a crafted ?id= from injecting markup
+    return _PREVIEW_TEMPLATE.format(
+        entity_id=html_escape(entity_id),
+        lccn=html_escape(lccn)
+    )
 
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
+    return json_response({
         'error': 'Endpoint not found',
         'available_endpoints': ['/reconcile', '/view', '/preview', '/']
-    }), 404
+    }, 404)
 
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
+    return json_response({
         'error': 'Internal server error',
         'message': str(error)
-    }), 500
+    }, 500)
 
 
 if __name__ == '__main__':
@@ -390,4 +639,21 @@ if __name__ == '__main__':
     print(f"Service URL: {SERVICE_BASE_URL}/reconcile")
     print(f"Add this URL to OpenRefine to use the reconciliation service")
     print("="*70)
-    app.run(debug=True, host='0.0.0.0', port=5724)
+
+    # Debug mode (reloader + single-threaded debugger) is opt-in now;
+    # production should sit behind a real WSGI server (see README)
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+    if debug:
+        app.run(debug=True, host='0.0.0.0', port=5724)
+    else:
+        try:
+            from waitress import serve
+            print("Serving with waitress (set FLASK_DEBUG=1 for the dev server)")
+            serve(app, host='0.0.0.0', port=5724, threads=8)
+        except ImportError:
+            app.run(debug=False, host='0.0.0.0', port=5724, threaded=True)
+else:
+    # Imported by a WSGI server (e.g. `gunicorn --preload app:app`) -
+    # load the data at import so workers fork after it is in memory
+    load_data()
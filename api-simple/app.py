@@ -14,10 +14,63 @@ import string
 import unicodedata
 import re
 import os
+import tempfile
+
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Levenshtein
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    # Fall back to the pure-Python implementation below
+    rf_process = None
+    Levenshtein = None
+    HAS_RAPIDFUZZ = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    # Optional - Flask's jsonify is used when orjson is not installed
+    orjson = None
+    HAS_ORJSON = False
+
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    # Optional - msgpack.unpackb is used when msgspec is not installed
+    msgspec = None
+    HAS_MSGSPEC = False
+
+try:
+    import numpy as np
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    # Optional - only used when rapidfuzz is not installed
+    np = None
+    njit = None
+    HAS_NUMBA = False
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+
+def json_response(payload, status=200):
+    """
+    jsonify replacement that serializes with orjson when it is
+    installed (3-10x faster, emits bytes directly) and falls back to
+    Flask's encoder otherwise.
+    """
+    if HAS_ORJSON:
+        return app.response_class(orjson.dumps(payload), status=status,
+                                  mimetype='application/json')
+
+    response = jsonify(payload)
+    response.status_code = status
+    return response
+
+
 # Global variables for trie and lookup data
 trie = None
 lookup = None
@@ -32,6 +85,17 @@ LCCN_PREFIX_MAP = {
     '6': 'n'
 }
 
+# Index by first digit of the compact LCCN - no dict hash or .get per
+# call. Digits outside the known map fall through to the default.
+_LCCN_PREFIX_TABLE = [None] * 10
+for _digit, _prefix in LCCN_PREFIX_MAP.items():
+    _LCCN_PREFIX_TABLE[int(_digit)] = _prefix
+
+# Built once at import - normalize_string runs on every request
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation)
+# ASCII uppercase -> lowercase for bytes.translate
+_BYTES_LOWER = bytes.maketrans(bytes(range(65, 91)), bytes(range(97, 123)))
+
 
 def normalize_string(name):
     """
@@ -42,96 +106,290 @@ def normalize_string(name):
     4. Remove spaces
     5. Sort characters
     6. Move non-letter characters to the end
+
+    After the unicode fold the pipeline stays in bytes: one translate
+    call lowercases and strips spaces, and the sort runs on raw byte
+    values, avoiding a chain of intermediate str objects.
     """
     # Remove punctuation
-    norm = name.translate(str.maketrans('', '', string.punctuation))
+    norm = name.translate(_PUNCT_TABLE)
 
     # Normalize unicode (NFKD) and remove non-ASCII
-    norm = unicodedata.normalize('NFKD', norm).encode('ascii', 'ignore').decode('utf-8')
+    norm_bytes = unicodedata.normalize('NFKD', norm).encode('ascii', 'ignore')
+
+    # Lowercase and remove spaces in a single pass, then sort
+    norm_bytes = bytes(sorted(norm_bytes.translate(_BYTES_LOWER, delete=b' ')))
+
+    # Move non-letter characters to the end (the bytes are sorted, so
+    # everything before the first a-z byte is the non-letter prefix)
+    first_letter_index = next(
+        (i for i, c in enumerate(norm_bytes) if 0x61 <= c <= 0x7a), 0
+    )
+    if first_letter_index:
+        norm_bytes = norm_bytes[first_letter_index:] + norm_bytes[:first_letter_index]
+
+    return norm_bytes.decode('ascii')
+
+
+def normalize_label(label):
+    """
+    Reduce a label to its comparison form: lowercase, alphanumeric only.
+    Used for Levenshtein scoring against the (equally normalized) query.
+    """
+    return ''.join(c for c in label.lower() if c.isalnum())
+
+
+def myers_distance(s1, s2):
+    """
+    Bit-parallel Levenshtein distance (Myers/Hyyro algorithm).
+    Requires len(s1) <= 64 so the pattern fits in one machine word;
+    processes one column of the DP matrix per bitwise step instead of
+    one cell per loop iteration.
+    """
+    m = len(s1)
+
+    if m == 0:
+        return len(s2)
+
+    # Per-character bitmask of positions in the pattern
+    peq = {}
+    for i, ch in enumerate(s1):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
 
-    # Convert to lowercase
-    norm = norm.lower()
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
 
-    # Remove spaces
-    norm = norm.replace(' ', '')
+    vp = full
+    vn = 0
+    score = m
 
-    # Sort characters
-    norm = ''.join(sorted(norm))
+    for ch in s2:
+        eq = peq.get(ch, 0)
+        d0 = ((((eq & vp) + vp) & full) ^ vp) | eq | vn
+        hp = vn | (~(d0 | vp) & full)
+        hn = vp & d0
 
-    # Move non-letter characters to the end
-    try:
-        match = re.search(r"[a-z]", norm)
-        if match:
-            first_letter_index = match.start()
-            first_part = norm[:first_letter_index]
-            second_part = norm[first_letter_index:]
-            norm = second_part + first_part
-    except:
-        pass
+        if hp & last:
+            score += 1
+        if hn & last:
+            score -= 1
 
-    return norm
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(d0 | hp) & full)
+        vn = hp & d0
 
+    return score
 
-def levenshtein_distance(s1, s2):
+
+def levenshtein_distance(s1, s2, score_cutoff=None):
     """
     Calculate Levenshtein distance between two strings.
     Used for finding best match when multiple labels map to the same normalized form.
+    Dispatches to the bit-parallel Myers algorithm when either string fits
+    in a 64-bit word (the common case for normalized LCNAF labels), and
+    falls back to the full DP matrix otherwise.
+
+    If score_cutoff is given and the distance is known to exceed it,
+    returns score_cutoff + 1 without finishing the computation.
     """
+    # The length difference is a lower bound on the distance
+    if score_cutoff is not None and abs(len(s1) - len(s2)) > score_cutoff:
+        return score_cutoff + 1
+
+    if len(s1) <= 64:
+        return myers_distance(s1, s2)
+    if len(s2) <= 64:
+        return myers_distance(s2, s1)
+
     len1 = len(s1)
     len2 = len(s2)
 
-    # Create matrix
-    matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
+    # Keep the row buffers as short as possible
+    if len2 > len1:
+        s1, s2 = s2, s1
+        len1, len2 = len2, len1
 
-    # Initialize first column and row
-    for i in range(len1 + 1):
-        matrix[i][0] = i
-    for j in range(len2 + 1):
-        matrix[0][j] = j
+    # Rolling two-row buffers - only the previous row is ever read, so
+    # the full (len1+1) x (len2+1) matrix is never materialized
+    prev = list(range(len2 + 1))
+    curr = [0] * (len2 + 1)
 
-    # Fill matrix
     for i in range(1, len1 + 1):
+        curr[0] = i
+        c1 = s1[i - 1]
+
         for j in range(1, len2 + 1):
-            cost = 0 if s1[i - 1] == s2[j - 1] else 1
-            matrix[i][j] = min(
-                matrix[i - 1][j] + 1,      # deletion
-                matrix[i][j - 1] + 1,      # insertion
-                matrix[i - 1][j - 1] + cost  # substitution
+            cost = 0 if c1 == s2[j - 1] else 1
+            curr[j] = min(
+                prev[j] + 1,        # deletion
+                curr[j - 1] + 1,    # insertion
+                prev[j - 1] + cost  # substitution
             )
 
-    return matrix[len1][len2]
+        # Every remaining cell is >= the row minimum, so give up early
+        # once no path can beat the cutoff
+        if score_cutoff is not None and min(curr) > score_cutoff:
+            return score_cutoff + 1
+
+        prev, curr = curr, prev
+
+    return prev[len2]
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _levenshtein_kernel(a, b):
+        """Rolling one-row Levenshtein over codepoint arrays, JIT-compiled."""
+        n = b.shape[0]
+        row = np.arange(n + 1, dtype=np.int32)
+
+        for i in range(a.shape[0]):
+            diag = row[0]
+            row[0] = i + 1
+            ca = a[i]
+
+            for j in range(n):
+                cost = diag if ca == b[j] else diag + 1
+                diag = row[j + 1]
+                row[j + 1] = min(row[j + 1] + 1, row[j] + 1, cost)
+
+        return int(row[n])
+
+    def _encode_codepoints(s):
+        """Encode a string as an int32 codepoint array for the JIT kernel."""
+        return np.fromiter(map(ord, s), dtype=np.int32, count=len(s))
+
+
+def string_distance(s1, s2, score_cutoff=None):
+    """
+    Levenshtein distance between two strings.
+    Uses RapidFuzz's C implementation when available, then a Numba-JIT
+    kernel if installed, then pure Python. A score_cutoff aborts the
+    computation once the distance is known to exceed it, returning
+    score_cutoff + 1.
+    """
+    if HAS_RAPIDFUZZ:
+        return Levenshtein.distance(s1, s2, score_cutoff=score_cutoff)
+
+    if HAS_NUMBA:
+        if score_cutoff is not None and abs(len(s1) - len(s2)) > score_cutoff:
+            return score_cutoff + 1
+        return _levenshtein_kernel(_encode_codepoints(s1), _encode_codepoints(s2))
+
+    return levenshtein_distance(s1, s2, score_cutoff=score_cutoff)
 
 
-def find_best_match(original_input, labels):
+def sift4_distance(s1, s2, max_offset=5):
+    """
+    Approximate string distance (Sift4, simplest variant).
+    Single linear pass with a small offset window - not exact edit
+    distance, but close enough to rank candidates for a shortlist.
+    """
+    if not s1:
+        return len(s2)
+    if not s2:
+        return len(s1)
+
+    len1 = len(s1)
+    len2 = len(s2)
+
+    c1 = 0        # cursor in s1
+    c2 = 0        # cursor in s2
+    lcss = 0      # longest common subsequence length
+    local_cs = 0  # local common substring length
+
+    while c1 < len1 and c2 < len2:
+        if s1[c1] == s2[c2]:
+            local_cs += 1
+        else:
+            lcss += local_cs
+            local_cs = 0
+
+            if c1 != c2:
+                c1 = c2 = max(c1, c2)
+
+            # Look ahead within the offset window for a transposition
+            # (either cursor may already sit past its string end after
+            # the resync above, hence both bounds checks)
+            for i in range(max_offset):
+                if c1 + i < len1 and c2 < len2 and s1[c1 + i] == s2[c2]:
+                    c1 += i
+                    local_cs += 1
+                    break
+                if c2 + i < len2 and c1 < len1 and s1[c1] == s2[c2 + i]:
+                    c2 += i
+                    local_cs += 1
+                    break
+
+        c1 += 1
+        c2 += 1
+
+    lcss += local_cs
+    return max(len1, len2) - lcss
+
+
+# How many Sift4-ranked candidates get exact Levenshtein scoring
+_SIFT4_SHORTLIST = 3
+
+
+def find_best_match(original_input, bucket):
     """
     Find best matching label using Levenshtein distance.
-    Labels is a list of [lccn, label] pairs (arrays with 2 elements).
-    Returns the best matching lccn, label, and distance.
+    bucket is the (lccns, labels, normalized_labels) struct-of-arrays
+    built in load_data. Returns the best matching lccn, label, and distance.
     """
     # Normalize input for comparison (remove non-alphanumeric)
-    normalized_input = ''.join(c for c in original_input.lower() if c.isalnum())
-
-    best_match = None
-    best_distance = float('inf')
+    normalized_input = normalize_label(original_input)
+
+    lccns, labels, norms = bucket
+
+    if HAS_RAPIDFUZZ:
+        # Score all labels in one C call instead of a Python loop
+        result = rf_process.extractOne(
+            normalized_input, norms, scorer=Levenshtein.distance
+        )
+        if result is None:
+            return None
+
+        _, distance, index = result
+        return {
+            'lccn': lccns[index],
+            'label': labels[index],
+            'distance': distance
+        }
 
-    for item in labels:
-        # Item is [lccn, label] format
-        lccn_num = item[0]
-        label = item[1]
+    # Without rapidfuzz, rank big buckets with the O(n) Sift4
+    # approximation first and pay for exact Levenshtein only on the
+    # closest few (an exact match scores 0 in Sift4, so it always
+    # survives the shortlist)
+    indices = range(len(lccns))
+    if len(lccns) > _SIFT4_SHORTLIST:
+        indices = sorted(
+            indices,
+            key=lambda i: sift4_distance(normalized_input, norms[i])
+        )[:_SIFT4_SHORTLIST]
 
-        # Normalize label for comparison (remove non-alphanumeric)
-        normalized_label = ''.join(c for c in label.lower() if c.isalnum())
+    best_match = None
+    best_distance = None
 
-        distance = levenshtein_distance(normalized_input, normalized_label)
+    for i in indices:
+        # Cap the computation at the best distance seen so far
+        distance = string_distance(normalized_input, norms[i],
+                                   score_cutoff=best_distance)
 
-        if distance < best_distance:
+        if best_distance is None or distance < best_distance:
             best_distance = distance
             best_match = {
-                'lccn': lccn_num,
-                'label': label,
+                'lccn': lccns[i],
+                'label': labels[i],
                 'distance': distance
             }
 
+            # Exact match - no need to score the remaining labels
+            if distance == 0:
+                break
+
     return best_match
 
 
@@ -144,10 +402,9 @@ def convert_lccn(numeric_lccn):
         return numeric_lccn
 
     lccn_str = str(numeric_lccn)
-    first_digit = lccn_str[0]
+    prefix = _LCCN_PREFIX_TABLE[ord(lccn_str[0]) - 48]
 
-    prefix = LCCN_PREFIX_MAP.get(first_digit)
-    if not prefix:
+    if prefix is None:
         # Default to 'n' prefix
         return f"n{lccn_str.zfill(8)}"
 
@@ -166,19 +423,34 @@ def load_data():
     print(f"Loading trie from: {trie_path}")
     print(f"Loading lookup from: {lookup_path}")
 
-    # Load and decompress trie
-    with open(trie_path, 'rb') as f:
-        trie_compressed = f.read()
+    trie = marisa_trie.Trie()
+
+    # A pre-decompressed sidecar (`gunzip -k trie.marisa.bin` renamed to
+    # trie.marisa at deploy time) can be mmapped by every worker
+    # directly - one physical copy in the page cache no matter how many
+    # workers run. Otherwise decompress into an unlinked temp file.
+    sidecar_path = os.path.join(os.path.dirname(trie_path), 'trie.marisa')
 
-    trie_data = gzip.decompress(trie_compressed)
+    if os.path.exists(sidecar_path):
+        print(f"Using pre-decompressed trie: {sidecar_path}")
+        trie.mmap(sidecar_path)
+    else:
+        with open(trie_path, 'rb') as f:
+            trie_compressed = f.read()
 
-    # Write to temporary file for marisa_trie to load
-    temp_trie_path = '/tmp/trie_temp.marisa'
-    with open(temp_trie_path, 'wb') as f:
-        f.write(trie_data)
+        trie_data = gzip.decompress(trie_compressed)
 
-    trie = marisa_trie.Trie()
-    trie.load(temp_trie_path)
+        # Write to a temp file and memory-map it rather than trie.load() -
+        # the trie then lives in the page cache instead of anonymous heap,
+        # and the mapping survives unlinking the file
+        with tempfile.NamedTemporaryFile(suffix='.marisa', delete=False) as f:
+            f.write(trie_data)
+            temp_trie_path = f.name
+
+        del trie_data
+
+        trie.mmap(temp_trie_path)
+        os.unlink(temp_trie_path)
 
     print(f"Trie loaded: {len(trie):,} keys")
 
@@ -187,18 +459,43 @@ def load_data():
         lookup_compressed = f.read()
 
     lookup_data = gzip.decompress(lookup_compressed)
-    lookup = msgpack.unpackb(lookup_data, raw=False)
+
+    # msgspec's C decoder is several times faster than msgpack.unpackb
+    # on the multi-million entry list and allocates less along the way
+    if HAS_MSGSPEC:
+        lookup = msgspec.msgpack.decode(lookup_data)
+    else:
+        lookup = msgpack.unpackb(lookup_data, raw=False)
 
     print(f"Lookup loaded: {len(lookup):,} entries")
 
-    # Clean up temp file
-    os.remove(temp_trie_path)
+    # Convert multi-label buckets to a struct-of-arrays layout:
+    # (lccns, labels, normalized_labels) parallel tuples instead of a
+    # two-element Python list per label. Far fewer objects per bucket,
+    # and rapidfuzz can consume whole columns directly. Plain tuples
+    # rather than numpy arrays - the labels are variable-length strings
+    # and the APIs don't otherwise depend on numpy. In-memory only: the
+    # on-disk msgpack keeps the [lccn, label] shape shared with the
+    # JavaScript tools.
+    for i, entry in enumerate(lookup):
+        if isinstance(entry, list):
+            lookup[i] = (
+                tuple(item[0] for item in entry),
+                tuple(item[1] for item in entry),
+                tuple(normalize_label(item[1]) for item in entry),
+            )
+
+    print("Normalized label cache built")
+
+    # Pay the one-time JIT compile cost at startup, not on the first query
+    if HAS_NUMBA and not HAS_RAPIDFUZZ:
+        string_distance('numba', 'warmup')
 
 
 @app.route('/')
 def index():
     """API information endpoint."""
-    return jsonify({
+    return json_response({
         'name': 'LCNAF Reconciliation API',
         'version': '1.0.0',
         'description': 'Reconcile names against the Library of Congress Name Authority File',
@@ -217,12 +514,12 @@ def index():
 def health():
     """Health check endpoint."""
     if trie is None or lookup is None:
-        return jsonify({
+        return json_response({
             'status': 'unhealthy',
             'message': 'Data not loaded'
-        }), 503
+        }, 503)
 
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'trie_size': len(trie),
         'lookup_size': len(lookup)
@@ -244,10 +541,10 @@ def reconcile():
     name = request.args.get('q', '').strip()
 
     if not name:
-        return jsonify({
+        return json_response({
             'error': 'Missing required parameter: q',
             'example': '/reconcile?q=Woolf, Virginia, 1882-1941'
-        }), 400
+        }, 400)
 
     # Normalize the name
     normalized = normalize_string(name)
@@ -257,7 +554,7 @@ def reconcile():
 
     if trie_id is None:
         # Not found
-        return jsonify({
+        return json_response({
             'query': name,
             'normalized': normalized,
             'found': False,
@@ -268,7 +565,7 @@ def reconcile():
     lccn_data = lookup[trie_id]
 
     # Handle result based on type
-    if isinstance(lccn_data, list):
+    if isinstance(lccn_data, tuple):
         # Multiple labels map to this normalized form
         # Find best match using Levenshtein distance
         best_match = find_best_match(name, lccn_data)
@@ -276,19 +573,18 @@ def reconcile():
         if best_match:
             lccn_formatted = convert_lccn(best_match['lccn'])
 
-            # Create alternatives list
-            # Items are [lccn, label] format
+            # Create alternatives list from the parallel lccn/label columns
             alternatives = []
-            for item in lccn_data:
-                alt_lccn = convert_lccn(item[0])
+            for alt_lccn_num, alt_label in zip(lccn_data[0], lccn_data[1]):
+                alt_lccn = convert_lccn(alt_lccn_num)
                 if alt_lccn != lccn_formatted:
                     alternatives.append({
                         'lccn': alt_lccn,
-                        'label': item[1],
+                        'label': alt_label,
                         'uri': f"http://id.loc.gov/authorities/names/{alt_lccn}"
                     })
 
-            return jsonify({
+            return json_response({
                 'query': name,
                 'normalized': normalized,
                 'found': True,
@@ -297,14 +593,14 @@ def reconcile():
                 'matched_label': best_match['label'],
                 'levenshtein_distance': best_match['distance'],
                 'match_quality': 'exact' if best_match['distance'] == 0 else 'fuzzy',
-                'total_matches': len(lccn_data),
+                'total_matches': len(lccn_data[0]),
                 'alternatives': alternatives
             })
     else:
         # Single LCCN value (integer)
         lccn_formatted = convert_lccn(lccn_data)
 
-        return jsonify({
+        return json_response({
             'query': name,
             'normalized': normalized,
             'found': True,
@@ -316,18 +612,18 @@ def reconcile():
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
+    return json_response({
         'error': 'Endpoint not found',
         'available_endpoints': ['/reconcile', '/health', '/']
-    }), 404
+    }, 404)
 
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
+    return json_response({
         'error': 'Internal server error',
         'message': str(error)
-    }), 500
+    }, 500)
 
 
 if __name__ == '__main__':
@@ -337,4 +633,21 @@ if __name__ == '__main__':
     print("\nStarting Flask server...")
     print("API available at: http://localhost:5723")
     print("Example: http://localhost:5723/reconcile?q=Woolf, Virginia, 1882-1941")
-    app.run(debug=True, host='0.0.0.0', port=5723)
+
+    # Debug mode (reloader + single-threaded debugger) is opt-in now;
+    # production should sit behind a real WSGI server (see README)
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+    if debug:
+        app.run(debug=True, host='0.0.0.0', port=5723)
+    else:
+        try:
+            from waitress import serve
+            print("Serving with waitress (set FLASK_DEBUG=1 for the dev server)")
+            serve(app, host='0.0.0.0', port=5723, threads=8)
+        except ImportError:
+            app.run(debug=False, host='0.0.0.0', port=5723, threaded=True)
+else:
+    # Imported by a WSGI server (e.g. `gunicorn --preload app:app`) -
+    # load the data at import so workers fork after it is in memory
+    load_data()
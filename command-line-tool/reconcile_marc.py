@@ -13,16 +13,40 @@ Usage:
 import sys
 import os
 import gzip
+from array import array
+import mmap
+import struct
+import tempfile
 import string
 import unicodedata
-import re
+import functools
 import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import marisa_trie
 import msgpack
-from pymarc import MARCReader, Record, Field, parse_xml_to_array
+from pymarc import MARCReader, Record, Field, map_xml
 from pymarc.writer import MARCWriter, XMLWriter
 
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Levenshtein
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    # Fall back to the pure-Python implementation below
+    rf_process = None
+    Levenshtein = None
+    HAS_RAPIDFUZZ = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    # Reports fall back to the stdlib json module
+    orjson = None
+    HAS_ORJSON = False
+
 
 # LCCN prefix mapping
 LCCN_PREFIX_MAP = {
@@ -34,6 +58,12 @@ LCCN_PREFIX_MAP = {
     '6': 'n'
 }
 
+# Index by first digit of the compact LCCN - no dict hash or .get per
+# call. Digits outside the known map fall through to the default.
+_LCCN_PREFIX_TABLE = [None] * 10
+for _digit, _prefix in LCCN_PREFIX_MAP.items():
+    _LCCN_PREFIX_TABLE[int(_digit)] = _prefix
+
 # Maximum Levenshtein distance for matching
 MAX_LEVENSHTEIN_DISTANCE = 10
 
@@ -43,42 +73,67 @@ FIELDS_TO_PROCESS = ['100', '110', '700', '710']
 # Subfields to combine (in order)
 SUBFIELDS_TO_COMBINE = ['a', 'b', 'c', 'q', 'd', 'g']
 
+# Records handed to each worker process at a time
+BATCH_SIZE = 500
+
+# Buckets at least this long get a norm -> index dict for O(1) exact
+# matches; shorter ones just take a linear pre-scan
+EXACT_INDEX_MIN_BUCKET = 8
+
 # Global variables for trie and lookup data
 trie = None
 lookup = None
 
+# trie_id -> {norm_label: bucket index} for large buckets, built at load
+exact_match_index = {}
 
+# Precompiled translation tables - built once instead of per call
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation)
+# ASCII uppercase -> lowercase for bytes.translate
+_BYTES_LOWER = bytes.maketrans(bytes(range(65, 91)), bytes(range(97, 123)))
+
+
+@functools.lru_cache(maxsize=2**20)
 def normalize_string(name):
     """
     Normalize string exactly like the create_trie.py script does.
+    Results are memoized - MARC files repeat the same headings often.
+
+    After the unicode fold the pipeline stays in bytes: one translate
+    call lowercases and strips spaces, the sort runs on raw byte
+    values, and the letters-first reorder is a slice of the sorted
+    bytes - no regex and no chain of intermediate str objects.
     """
     # Remove punctuation
-    norm = name.translate(str.maketrans('', '', string.punctuation))
+    norm = name.translate(_PUNCT_TABLE)
 
     # Normalize unicode (NFKD) and remove non-ASCII
-    norm = unicodedata.normalize('NFKD', norm).encode('ascii', 'ignore').decode('utf-8')
+    norm_bytes = unicodedata.normalize('NFKD', norm).encode('ascii', 'ignore')
 
-    # Convert to lowercase
-    norm = norm.lower()
+    # Lowercase and remove spaces in a single pass, then sort
+    norm_bytes = bytes(sorted(norm_bytes.translate(_BYTES_LOWER, delete=b' ')))
 
-    # Remove spaces
-    norm = norm.replace(' ', '')
+    # Move non-letter characters to the end (the bytes are sorted, so
+    # everything before the first a-z byte is the non-letter prefix)
+    first_letter_index = next(
+        (i for i, c in enumerate(norm_bytes) if 0x61 <= c <= 0x7a), 0
+    )
+    if first_letter_index:
+        norm_bytes = norm_bytes[first_letter_index:] + norm_bytes[:first_letter_index]
 
-    # Sort characters
-    norm = ''.join(sorted(norm))
+    return norm_bytes.decode('ascii')
 
-    # Move non-letter characters to the end
-    try:
-        match = re.search(r"[a-z]", norm)
-        if match:
-            first_letter_index = match.start()
-            first_part = norm[:first_letter_index]
-            second_part = norm[first_letter_index:]
-            norm = second_part + first_part
-    except:
-        pass
 
-    return norm
+def normalize_label(label):
+    """Lowercase alphanumeric-only form used for Levenshtein comparison."""
+    return ''.join(c for c in label.lower() if c.isalnum())
+
+
+# Reusable DP rows for the pure-Python fallback - one contiguous int
+# buffer per row instead of a fresh list-of-lists every call. Each
+# worker process has its own copy, so there is no sharing to guard.
+_dp_prev = array('i')
+_dp_curr = array('i')
 
 
 def levenshtein_distance(s1, s2):
@@ -86,23 +141,33 @@ def levenshtein_distance(s1, s2):
     len1 = len(s1)
     len2 = len(s2)
 
-    matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
+    width = len2 + 1
+    if len(_dp_prev) < width:
+        grow = width - len(_dp_prev)
+        _dp_prev.extend([0] * grow)
+        _dp_curr.extend([0] * grow)
+
+    prev = _dp_prev
+    curr = _dp_curr
 
-    for i in range(len1 + 1):
-        matrix[i][0] = i
-    for j in range(len2 + 1):
-        matrix[0][j] = j
+    for j in range(width):
+        prev[j] = j
 
     for i in range(1, len1 + 1):
-        for j in range(1, len2 + 1):
-            cost = 0 if s1[i - 1] == s2[j - 1] else 1
-            matrix[i][j] = min(
-                matrix[i - 1][j] + 1,
-                matrix[i][j - 1] + 1,
-                matrix[i - 1][j - 1] + cost
+        curr[0] = i
+        c1 = s1[i - 1]
+
+        for j in range(1, width):
+            cost = 0 if c1 == s2[j - 1] else 1
+            curr[j] = min(
+                prev[j] + 1,
+                curr[j - 1] + 1,
+                prev[j - 1] + cost
             )
 
-    return matrix[len1][len2]
+        prev, curr = curr, prev
+
+    return prev[len2]
 
 
 def convert_lccn(numeric_lccn):
@@ -111,31 +176,67 @@ def convert_lccn(numeric_lccn):
         return numeric_lccn
 
     lccn_str = str(numeric_lccn)
-    first_digit = lccn_str[0]
+    prefix = _LCCN_PREFIX_TABLE[ord(lccn_str[0]) - 48]
 
-    prefix = LCCN_PREFIX_MAP.get(first_digit)
-    if not prefix:
+    if prefix is None:
         return f"n{lccn_str.zfill(8)}"
 
     return prefix + lccn_str[1:]
 
 
-def find_best_match(original_input, labels):
+def find_best_match(original_input, labels, trie_id=None):
     """
     Find the best match from multiple labels using Levenshtein distance.
     Returns (lccn, label, distance) or None if no good match found.
     """
-    normalized_input = ''.join(c for c in original_input.lower() if c.isalnum())
+    normalized_input = normalize_label(original_input)
+
+    # Exact hits are the common case - resolve them without paying for
+    # a Levenshtein pass over the bucket
+    exact = exact_match_index.get(trie_id) if trie_id is not None else None
+    if exact is not None:
+        index = exact.get(normalized_input)
+        if index is not None:
+            return (labels[index][0], labels[index][1], 0)
+    else:
+        for item in labels:
+            if item[2] == normalized_input:
+                return (item[0], item[1], 0)
+
+    if HAS_RAPIDFUZZ:
+        # One cdist call scores the whole bucket in C (workers=-1 lets
+        # big buckets fan out across threads); the cutoff makes pruned
+        # candidates come back as cutoff+1 so argmin still works
+        norm_labels = [item[2] for item in labels]
+        dists = rf_process.cdist(
+            [normalized_input], norm_labels,
+            scorer=Levenshtein.distance,
+            score_cutoff=MAX_LEVENSHTEIN_DISTANCE + 1,
+            workers=-1
+        )[0]
+
+        index = int(dists.argmin())
+        distance = int(dists[index])
+
+        if distance <= MAX_LEVENSHTEIN_DISTANCE:
+            return (labels[index][0], labels[index][1], distance)
+
+        return None
 
     best_match = None
     best_distance = float('inf')
+    qlen = len(normalized_input)
 
     for item in labels:
         lccn_num = item[0]
         label = item[1]
 
-        normalized_label = ''.join(c for c in label.lower() if c.isalnum())
-        distance = levenshtein_distance(normalized_input, normalized_label)
+        # The distance is at least the length difference, so candidates
+        # past the threshold never pay for the DP fill at all
+        if abs(qlen - len(item[2])) > MAX_LEVENSHTEIN_DISTANCE:
+            continue
+
+        distance = levenshtein_distance(normalized_input, item[2])
 
         if distance < best_distance:
             best_distance = distance
@@ -165,13 +266,77 @@ def reconcile_name(name):
     lccn_data = lookup[trie_id]
 
     if isinstance(lccn_data, list):
+        if lccn_data and not isinstance(lccn_data[0], tuple):
+            # Binary lookup bucket: bare LCCNs with no labels to rank,
+            # so take the first entry
+            return (lccn_data[0], name, 0)
+
         # Multiple labels map to this normalized form
-        return find_best_match(name, lccn_data)
+        return find_best_match(name, lccn_data, trie_id)
     else:
         # Single LCCN value
         return (lccn_data, name, 0)
 
 
+def reconcile_names(names):
+    """
+    Reconcile a collection of unique names in bulk.
+    Returns {name: (lccn, matched_label, distance) or None}.
+
+    Names whose buckets coincide are scored with a single cdist call so
+    the whole bucket matrix crosses the C boundary once.
+    """
+    resolved = {}
+    bucket_queries = {}
+
+    for name in names:
+        normalized = normalize_string(name)
+        trie_id = trie.get(normalized)
+
+        if trie_id is None:
+            resolved[name] = None
+            continue
+
+        lccn_data = lookup[trie_id]
+
+        if isinstance(lccn_data, list):
+            if lccn_data and not isinstance(lccn_data[0], tuple):
+                # Binary lookup bucket: bare LCCNs with no labels to rank
+                resolved[name] = (lccn_data[0], name, 0)
+            else:
+                bucket_queries.setdefault(trie_id, []).append(name)
+        else:
+            resolved[name] = (lccn_data, name, 0)
+
+    for trie_id, bucket_names in bucket_queries.items():
+        bucket = lookup[trie_id]
+
+        if HAS_RAPIDFUZZ and len(bucket_names) > 1:
+            # Score every query against the bucket in one matrix call
+            norm_labels = [item[2] for item in bucket]
+            queries = [normalize_label(name) for name in bucket_names]
+            dists = rf_process.cdist(
+                queries, norm_labels,
+                scorer=Levenshtein.distance,
+                score_cutoff=MAX_LEVENSHTEIN_DISTANCE + 1,
+                workers=-1
+            )
+
+            for name, row in zip(bucket_names, dists):
+                index = int(row.argmin())
+                distance = int(row[index])
+
+                if distance <= MAX_LEVENSHTEIN_DISTANCE:
+                    resolved[name] = (bucket[index][0], bucket[index][1], distance)
+                else:
+                    resolved[name] = None
+        else:
+            for name in bucket_names:
+                resolved[name] = find_best_match(name, bucket, trie_id)
+
+    return resolved
+
+
 def extract_name_from_field(field):
     """
     Extract name string from a MARC field by combining specific subfields.
@@ -203,9 +368,75 @@ def add_zero_subfield(field, lccn):
     return True
 
 
+class _BinaryLookup:
+    """
+    Random-access view over the type-tagged binary lookup produced by
+    scripts_python/create_binary_lookup.py (trie_lookup.bin plus its
+    trie_lookup_offsets.bin index).
+
+    Entries are decoded on demand straight from the mmap, so nothing is
+    deserialized up front and startup is near-instant. Note this format
+    stores bare LCCN values without labels, so ambiguous buckets cannot
+    be Levenshtein-ranked - reconcile_name falls back to the first LCCN.
+    """
+
+    def __init__(self, data_path, offsets_path):
+        self._data_file = open(data_path, 'rb')
+        self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets_file = open(offsets_path, 'rb')
+        self._offsets = mmap.mmap(self._offsets_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Version 2 files start with an 0xFE sentinel + 'LKP' magic +
+        # version byte and use 5-byte integers; headerless version 1
+        # files used 8-byte integers (0xFE is never a valid type byte)
+        if self._data[:4] == b'\xfeLKP':
+            self._int_size = 5
+        else:
+            self._int_size = 8
+
+    def __len__(self):
+        return len(self._offsets) // 4
+
+    def __getitem__(self, idx):
+        offset = struct.unpack_from('>I', self._offsets, idx * 4)[0]
+        data = self._data
+        int_size = self._int_size
+        type_byte = data[offset]
+
+        if type_byte == 0x00:
+            return None
+
+        if type_byte == 0x01:
+            return int.from_bytes(data[offset + 1:offset + 1 + int_size], 'big')
+
+        if type_byte == 0x02:
+            count = data[offset + 1]
+            pos = offset + 2
+            values = []
+            for _ in range(count):
+                if data[pos] == 0xff:
+                    # String mini-entry marker (malformed source data).
+                    # Unambiguous: the encoder never emits an integer
+                    # whose lead byte is 0xFF - those values get the
+                    # zero corrupted-data marker instead
+                    length = data[pos + 1]
+                    values.append(data[pos + 2:pos + 2 + length].decode('utf-8'))
+                    pos += 2 + length
+                else:
+                    values.append(int.from_bytes(data[pos:pos + int_size], 'big'))
+                    pos += int_size
+            return values
+
+        if type_byte == 0x03:
+            length = data[offset + 1]
+            return data[offset + 2:offset + 2 + length].decode('utf-8')
+
+        raise ValueError(f"Unknown entry type: {type_byte:#04x}")
+
+
 def load_trie_data():
     """Load the trie and lookup data."""
-    global trie, lookup
+    global trie, lookup, exact_match_index
 
     # Get paths relative to script location
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -216,31 +447,179 @@ def load_trie_data():
     print(f"Loading trie from: {trie_path}")
     print(f"Loading lookup from: {lookup_path}")
 
-    # Load and decompress trie
-    with open(trie_path, 'rb') as f:
-        trie_compressed = f.read()
+    trie = marisa_trie.Trie()
 
-    trie_data = gzip.decompress(trie_compressed)
+    # A pre-decompressed sidecar (`gunzip -k -c trie.marisa.bin >
+    # trie.marisa`) can be mmapped directly - no decompression and no
+    # temp write at all. Otherwise decompress into an unlinked temp
+    # file and mmap that instead of a fixed /tmp path.
+    sidecar_path = os.path.join(os.path.dirname(trie_path), 'trie.marisa')
 
-    temp_trie_path = '/tmp/trie_temp_marc.marisa'
-    with open(temp_trie_path, 'wb') as f:
-        f.write(trie_data)
+    if os.path.exists(sidecar_path):
+        print(f"Using pre-decompressed trie: {sidecar_path}")
+        trie.mmap(sidecar_path)
+    else:
+        with open(trie_path, 'rb') as f:
+            trie_compressed = f.read()
 
-    trie = marisa_trie.Trie()
-    trie.load(temp_trie_path)
+        trie_data = gzip.decompress(trie_compressed)
 
-    print(f"Trie loaded: {len(trie):,} keys")
+        with tempfile.NamedTemporaryFile(suffix='.marisa', delete=False) as f:
+            f.write(trie_data)
+            temp_trie_path = f.name
 
-    # Load and decompress lookup data
-    with open(lookup_path, 'rb') as f:
-        lookup_compressed = f.read()
+        del trie_data
 
-    lookup_data = gzip.decompress(lookup_compressed)
-    lookup = msgpack.unpackb(lookup_data, raw=False)
+        # The mapping stays valid after the unlink, so the trie lives
+        # in the page cache with no file left behind
+        trie.mmap(temp_trie_path)
+        os.unlink(temp_trie_path)
+
+    print(f"Trie loaded: {len(trie):,} keys")
+
+    # Fastest path: the custom binary lookup plus its offset index
+    # (from scripts_python/create_binary_lookup.py) gives O(1) per-entry
+    # random access off the mmap with no upfront deserialization.
+    # Next: an uncompressed sidecar (`gunzip -k -c trie_lookup.msgpack.bin
+    # > trie_lookup.msgpack`) is mmapped and unpacked straight from the
+    # page cache - no gzip pass and no in-memory compressed copy.
+    # use_list=False unpacks buckets as tuples, which allocate less.
+    lookup_dir = os.path.dirname(lookup_path)
+    binary_path = os.path.join(lookup_dir, 'trie_lookup.bin')
+    offsets_path = os.path.join(lookup_dir, 'trie_lookup_offsets.bin')
+    lookup_sidecar = os.path.join(lookup_dir, 'trie_lookup.msgpack')
+
+    if os.path.exists(binary_path) and os.path.exists(offsets_path):
+        print(f"Using binary lookup: {binary_path}")
+        lookup = _BinaryLookup(binary_path, offsets_path)
+    elif os.path.exists(lookup_sidecar):
+        print(f"Using pre-decompressed lookup: {lookup_sidecar}")
+        with open(lookup_sidecar, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                lookup = list(msgpack.unpackb(
+                    mm, raw=False, use_list=False, strict_map_key=False
+                ))
+    else:
+        with open(lookup_path, 'rb') as f:
+            lookup_compressed = f.read()
+
+        lookup_data = gzip.decompress(lookup_compressed)
+        lookup = msgpack.unpackb(lookup_data, raw=False)
+
+    # Precompute the comparison form of every bucket label once so
+    # find_best_match never re-normalizes the same LCNAF label (the
+    # binary lookup has no labels, so there is nothing to precompute).
+    # Large buckets also get a norm -> index dict so exact matches
+    # resolve with a single hash probe.
+    exact_match_index = {}
+
+    if isinstance(lookup, list):
+        for trie_id, entry in enumerate(lookup):
+            if isinstance(entry, (list, tuple)):
+                bucket = [
+                    (item[0], item[1], normalize_label(item[1])) for item in entry
+                ]
+                lookup[trie_id] = bucket
+
+                if len(bucket) >= EXACT_INDEX_MIN_BUCKET:
+                    exact = {}
+                    for index, item in enumerate(bucket):
+                        exact.setdefault(item[2], index)
+                    exact_match_index[trie_id] = exact
 
     print(f"Lookup loaded: {len(lookup):,} entries")
 
-    os.remove(temp_trie_path)
+
+def _process_record_batch(records):
+    """
+    Reconcile a batch of records inside a worker process.
+
+    Returns (records, rows, batch_stats). Each row's 'record' value is
+    the index within the batch; the parent rebases it to the global
+    record number when it drains batches in order.
+    """
+    batch_stats = {
+        'total_records': 0,
+        'total_fields_processed': 0,
+        'fields_reconciled': 0,
+        'fields_not_found': 0,
+        'fields_poor_match': 0
+    }
+    rows = []
+
+    # Phase 1: walk the batch once collecting the name fields - the
+    # same heading usually recurs across records, so names are resolved
+    # once per unique string rather than once per field
+    entries = []
+
+    for record_index, record in enumerate(records):
+        batch_stats['total_records'] += 1
+
+        # Get system ID from 001
+        system_id = record['001'].value() if record.get('001') else 'NO_ID'
+
+        # Process name fields
+        for field_tag in FIELDS_TO_PROCESS:
+            fields = record.get_fields(field_tag)
+
+            for field in fields:
+                batch_stats['total_fields_processed'] += 1
+
+                # Extract name
+                name = extract_name_from_field(field)
+
+                if not name:
+                    continue
+
+                entries.append((record_index, system_id, field_tag, field, name))
+
+    # Phase 2: reconcile the unique names in bulk
+    resolved = reconcile_names({entry[4] for entry in entries})
+
+    # Phase 3: write $0 subfields and report rows back per field
+    for record_index, system_id, field_tag, field, name in entries:
+        result = resolved[name]
+
+        if result:
+            lccn_num, matched_label, distance = result
+            lccn = convert_lccn(lccn_num)
+
+            # Add $0 subfield
+            added = add_zero_subfield(field, lccn)
+
+            if distance <= MAX_LEVENSHTEIN_DISTANCE:
+                batch_stats['fields_reconciled'] += 1
+                status = 'RECONCILED'
+                if distance > 0:
+                    status += f' (distance: {distance})'
+            else:
+                batch_stats['fields_poor_match'] += 1
+                status = f'POOR_MATCH (distance: {distance})'
+
+            rows.append({
+                'record': record_index,
+                'system_id': system_id,
+                'field': field_tag,
+                'name': name,
+                'matched_label': matched_label,
+                'lccn': lccn,
+                'distance': distance,
+                'status': status
+            })
+        else:
+            batch_stats['fields_not_found'] += 1
+            rows.append({
+                'record': record_index,
+                'system_id': system_id,
+                'field': field_tag,
+                'name': name,
+                'matched_label': None,
+                'lccn': None,
+                'distance': None,
+                'status': 'NOT_FOUND'
+            })
+
+    return records, rows, batch_stats
 
 
 def process_marc_file(input_path):
@@ -260,15 +639,18 @@ def process_marc_file(input_path):
     # Create output filenames
     output_filename = f"reconciled_{input_path.name}"
     report_filename = f"report_{input_path.stem}.txt"
+    report_jsonl_filename = f"report_{input_path.stem}.jsonl"
     report_json_filename = f"report_{input_path.stem}.json"
 
     output_path = input_path.parent / output_filename
     report_path = input_path.parent / report_filename
+    report_jsonl_path = input_path.parent / report_jsonl_filename
     report_json_path = input_path.parent / report_json_filename
 
     print(f"\nProcessing: {input_path}")
     print(f"Output file: {output_path}")
     print(f"Report file: {report_path}")
+    print(f"JSONL results: {report_jsonl_path}")
     print(f"JSON report: {report_json_path}")
     print("=" * 70)
 
@@ -281,126 +663,119 @@ def process_marc_file(input_path):
         'fields_poor_match': 0
     }
 
-    # Detailed results for report
-    results = []
-
-    # Read records based on format
-    if is_xml:
-        with open(input_path, 'rb') as fh:
-            records = parse_xml_to_array(fh)
-        writer = XMLWriter(open(output_path, 'wb'))
-    else:
-        with open(input_path, 'rb') as fh:
-            records = [record for record in MARCReader(fh)]
-        writer = MARCWriter(open(output_path, 'wb'))
-
-    # Process each record
-    for record in records:
-        stats['total_records'] += 1
-
-        # Get system ID from 001
-        system_id = record['001'].value() if record.get('001') else 'NO_ID'
-
-        # Process name fields
-        for field_tag in FIELDS_TO_PROCESS:
-            fields = record.get_fields(field_tag)
-
-            for field in fields:
-                stats['total_fields_processed'] += 1
-
-                # Extract name
-                name = extract_name_from_field(field)
-
-                if not name:
-                    continue
-
-                # Reconcile
-                result = reconcile_name(name)
-
-                if result:
-                    lccn_num, matched_label, distance = result
-                    lccn = convert_lccn(lccn_num)
-
-                    # Add $0 subfield
-                    added = add_zero_subfield(field, lccn)
-
-                    if distance <= MAX_LEVENSHTEIN_DISTANCE:
-                        stats['fields_reconciled'] += 1
-                        status = 'RECONCILED'
-                        if distance > 0:
-                            status += f' (distance: {distance})'
-                    else:
-                        stats['fields_poor_match'] += 1
-                        status = f'POOR_MATCH (distance: {distance})'
-
-                    results.append({
-                        'record': stats['total_records'],
-                        'system_id': system_id,
-                        'field': field_tag,
-                        'name': name,
-                        'matched_label': matched_label,
-                        'lccn': lccn,
-                        'distance': distance,
-                        'status': status
-                    })
-                else:
-                    stats['fields_not_found'] += 1
-                    results.append({
-                        'record': stats['total_records'],
-                        'system_id': system_id,
-                        'field': field_tag,
-                        'name': name,
-                        'matched_label': None,
-                        'lccn': None,
-                        'distance': None,
-                        'status': 'NOT_FOUND'
-                    })
-
-        # Write modified record
-        writer.write(record)
+    # Reports are streamed as fields are processed so no result is ever
+    # buffered in memory: one JSON Lines row and one text block per field
+    # MB-sized buffers amortize the flush cost across thousands of rows
+    report = open(report_path, 'w', encoding='utf-8', buffering=1 << 20)
+    jsonl_fh = open(report_jsonl_path, 'wb', buffering=1 << 20)
+
+    report.write("=" * 70 + "\n")
+    report.write("LCNAF MARC Reconciliation Report\n")
+    report.write("=" * 70 + "\n\n")
+    report.write("DETAILED RESULTS\n")
+    report.write("-" * 70 + "\n\n")
+
+    def write_result(result):
+        """Append one field outcome to the JSONL and text reports."""
+        # orjson's C encoder is several times faster at small-object
+        # throughput, which is exactly the JSONL write pattern
+        if HAS_ORJSON:
+            jsonl_fh.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+        else:
+            jsonl_fh.write(json.dumps(result, ensure_ascii=False).encode('utf-8') + b'\n')
+
+        block = (
+            f"Record: {result['record']} | System ID: {result['system_id']}\n"
+            f"Field:  {result['field']}\n"
+            f"Name:   {result['name']}\n"
+            f"Status: {result['status']}\n"
+        )
+
+        if result['lccn']:
+            block += f"LCCN:   {result['lccn']}\n"
+            if result['matched_label'] != result['name']:
+                block += f"Matched: {result['matched_label']}\n"
+
+        report.write(block + "\n")
+
+    # Records fan out to worker processes in batches; the parent drains
+    # finished batches in submission order so the output file and the
+    # reports stay deterministic
+    max_workers = os.cpu_count() or 1
+    pending = deque()
+    batch = []
+
+    def flush_batch(executor):
+        if batch:
+            pending.append(executor.submit(_process_record_batch, list(batch)))
+            batch.clear()
+
+    def drain(limit):
+        """Consume finished batches in order down to `limit` outstanding."""
+        while len(pending) > limit:
+            records, rows, batch_stats = pending.popleft().result()
+
+            base = stats['total_records']
+            for row in rows:
+                row['record'] = base + row['record'] + 1
+                write_result(row)
+
+            for key, value in batch_stats.items():
+                stats[key] += value
+
+            for record in records:
+                writer.write(record)
+
+    def handle_record(record):
+        batch.append(record)
+        if len(batch) >= BATCH_SIZE:
+            flush_batch(executor)
+            # Keep a bounded window of outstanding batches as backpressure
+            drain(max_workers * 2)
+
+    # Stream records straight from the reader into worker batches - the
+    # file is never materialized as a list, so peak memory stays at one
+    # window of batches. Workers load the trie/lookup once each via the
+    # initializer (cheap with the mmap sidecars).
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=load_trie_data) as executor:
+        if is_xml:
+            writer = XMLWriter(open(output_path, 'wb'))
+            with open(input_path, 'rb') as fh:
+                map_xml(handle_record, fh)
+        else:
+            writer = MARCWriter(open(output_path, 'wb'))
+            with open(input_path, 'rb') as fh:
+                for record in MARCReader(fh):
+                    handle_record(record)
+
+        flush_batch(executor)
+        drain(0)
 
     writer.close()
 
-    # Generate report
-    with open(report_path, 'w', encoding='utf-8') as report:
-        report.write("=" * 70 + "\n")
-        report.write("LCNAF MARC Reconciliation Report\n")
-        report.write("=" * 70 + "\n\n")
-
-        report.write("STATISTICS\n")
-        report.write("-" * 70 + "\n")
-        report.write(f"Total records processed:     {stats['total_records']:>10,}\n")
-        report.write(f"Total fields processed:      {stats['total_fields_processed']:>10,}\n")
-        report.write(f"Fields reconciled:           {stats['fields_reconciled']:>10,}\n")
-        report.write(f"Fields not found:            {stats['fields_not_found']:>10,}\n")
-        report.write(f"Fields with poor match:      {stats['fields_poor_match']:>10,}\n")
-
-        if stats['total_fields_processed'] > 0:
-            success_rate = (stats['fields_reconciled'] / stats['total_fields_processed']) * 100
-            report.write(f"Success rate:                {success_rate:>9.1f}%\n")
-
-        report.write("\n" + "=" * 70 + "\n\n")
-
-        report.write("DETAILED RESULTS\n")
-        report.write("-" * 70 + "\n\n")
+    # Close out the streamed text report with the final statistics
+    report.write("=" * 70 + "\n\n")
+    report.write("STATISTICS\n")
+    report.write("-" * 70 + "\n")
+    report.write(f"Total records processed:     {stats['total_records']:>10,}\n")
+    report.write(f"Total fields processed:      {stats['total_fields_processed']:>10,}\n")
+    report.write(f"Fields reconciled:           {stats['fields_reconciled']:>10,}\n")
+    report.write(f"Fields not found:            {stats['fields_not_found']:>10,}\n")
+    report.write(f"Fields with poor match:      {stats['fields_poor_match']:>10,}\n")
 
-        for result in results:
-            report.write(f"Record: {result['record']} | System ID: {result['system_id']}\n")
-            report.write(f"Field:  {result['field']}\n")
-            report.write(f"Name:   {result['name']}\n")
-            report.write(f"Status: {result['status']}\n")
-
-            if result['lccn']:
-                report.write(f"LCCN:   {result['lccn']}\n")
-                if result['matched_label'] != result['name']:
-                    report.write(f"Matched: {result['matched_label']}\n")
+    if stats['total_fields_processed'] > 0:
+        success_rate = (stats['fields_reconciled'] / stats['total_fields_processed']) * 100
+        report.write(f"Success rate:                {success_rate:>9.1f}%\n")
 
-            report.write("\n")
+    report.close()
+    jsonl_fh.close()
 
-    # Generate JSON report
+    # Generate JSON summary (per-field rows live in the JSONL file)
     json_report = {
         'input_file': str(input_path),
         'output_file': str(output_path),
+        'results_file': str(report_jsonl_path),
         'processing_date': None,  # Could add timestamp if needed
         'statistics': {
             'total_records': stats['total_records'],
@@ -409,12 +784,15 @@ def process_marc_file(input_path):
             'fields_not_found': stats['fields_not_found'],
             'fields_poor_match': stats['fields_poor_match'],
             'success_rate': (stats['fields_reconciled'] / stats['total_fields_processed'] * 100) if stats['total_fields_processed'] > 0 else 0
-        },
-        'results': results
+        }
     }
 
-    with open(report_json_path, 'w', encoding='utf-8') as json_file:
-        json.dump(json_report, json_file, indent=2, ensure_ascii=False)
+    if HAS_ORJSON:
+        with open(report_json_path, 'wb') as json_file:
+            json_file.write(orjson.dumps(json_report, option=orjson.OPT_INDENT_2))
+    else:
+        with open(report_json_path, 'w', encoding='utf-8') as json_file:
+            json.dump(json_report, json_file, indent=2, ensure_ascii=False)
 
     print("\n" + "=" * 70)
     print("PROCESSING COMPLETE")
@@ -431,6 +809,7 @@ def process_marc_file(input_path):
 
     print(f"\nOutput written to:      {output_path}")
     print(f"Text report written to: {report_path}")
+    print(f"JSONL results written to: {report_jsonl_path}")
     print(f"JSON report written to: {report_json_path}")
 
 
@@ -446,12 +825,10 @@ def main():
     print("=" * 70)
     print("LCNAF MARC Reconciliation Tool")
     print("=" * 70)
-    print("\nLoading LCNAF data...")
-
-    load_trie_data()
-
-    print("\nData loaded successfully!")
 
+    # No load here: the parent only parses records and writes output,
+    # so the trie/lookup data is loaded once per pool worker via the
+    # executor initializer instead of paying for an extra unused copy
     process_marc_file(input_file)
 
 
@@ -4,7 +4,11 @@ import gzip
 
 """
 Binary format for LCNAF lookup data:
-- Maintains index positions (index N in array → byte offset calculation)
+- File starts with a 5 byte header: 0xFE sentinel + b'LKP' magic + version byte
+  (0xFE can never be a valid type byte, so version 1 files without a header
+  are still detectable)
+- Maintains index positions (index N in array → byte offset calculation,
+  offsets are absolute so they already account for the header)
 - Each entry has a type byte followed by data
 - Supports: null, single int, list of ints, or string (for malformed data)
 
@@ -15,25 +19,40 @@ Entry format:
     0x02 = list of integers (followed by 1 byte count + 5 bytes per int)
     0x03 = string (followed by 1 byte length + UTF-8 bytes)
 
-Integer encoding: 8 bytes (64 bits) to handle all values safely
+Integer encoding: 5 bytes (40 bits) big-endian - LCCNs stay well under 2^40
+after the corruption threshold, so the old 8 byte width wasted 3 bytes per
+value (and gzip compresses the tighter stream better too). Inside a list,
+a 0xFF byte where an integer would start marks a string mini-entry
+(1 byte length + UTF-8 bytes), so 0xFF is a reserved lead byte and
+integers >= 0xff00000000 are stored as the zero corrupted-data marker.
 """
 
-def encode_int64(value):
-    """Encode an integer as 8 bytes (64 bits)"""
+FORMAT_VERSION = 2
+HEADER = b'\xfeLKP' + bytes([FORMAT_VERSION])
+
+INT_SIZE = 5  # bytes per integer value
+# inside a type 0x02 list the 0xFF lead byte is reserved for the string
+# mini-entry marker, so no encoded integer may begin with it: anything
+# at or above 0xff00000000 (~1.095e12, already past the corruption
+# threshold) is stored as the zero corrupted-data marker instead
+INT_MAX = 0xff << ((INT_SIZE - 1) * 8)
+
+def encode_int40(value):
+    """Encode an integer as 5 bytes (40 bits)"""
     if value is None:
-        return b'\x00\x00\x00\x00\x00\x00\x00\x00'
+        return b'\x00' * INT_SIZE
     if not isinstance(value, int):
         # Return marker for invalid data - will be handled as string
         return None
-    # Use unsigned 64-bit if within range, otherwise truncate
-    if value < 0 or value >= 2**64:
-        # Handle overflow - store as 0 (corrupted data marker)
-        return b'\x00\x00\x00\x00\x00\x00\x00\x00'
-    return struct.pack('>Q', value)
+    if value < 0 or value >= INT_MAX:
+        # Handle overflow / reserved lead byte - store as 0
+        # (corrupted data marker)
+        return b'\x00' * INT_SIZE
+    return value.to_bytes(INT_SIZE, 'big')
 
-def decode_int64(data):
-    """Decode 8 bytes to an integer"""
-    return struct.unpack('>Q', data)[0]
+def decode_int40(data):
+    """Decode 5 bytes to an integer"""
+    return int.from_bytes(data, 'big')
 
 def encode_entry(entry):
     """Encode a single lookup entry"""
@@ -48,7 +67,7 @@ def encode_entry(entry):
         return b'\x03' + struct.pack('B', len(encoded_str)) + encoded_str
     elif isinstance(entry, int):
         # Type 0x01: single integer
-        return b'\x01' + encode_int64(entry)
+        return b'\x01' + encode_int40(entry)
     elif isinstance(entry, list):
         # Type 0x02: list of integers (or strings)
         count = len(entry)
@@ -64,10 +83,10 @@ def encode_entry(entry):
                 # Use a marker: 0xFF followed by length and string
                 data += b'\xff' + struct.pack('B', len(encoded_str)) + encoded_str
             else:
-                encoded_int = encode_int64(val)
+                encoded_int = encode_int40(val)
                 if encoded_int is None:
                     # Shouldn't happen, but handle it
-                    data += b'\x00\x00\x00\x00\x00\x00\x00\x00'
+                    data += b'\x00' * INT_SIZE
                 else:
                     data += encoded_int
         return b'\x02' + data
@@ -83,7 +102,7 @@ print(f"Loaded {len(lookup):,} entries")
 
 # Encode to binary
 print("Encoding to binary format...")
-binary_data = bytearray()
+binary_data = bytearray(HEADER)
 entry_offsets = []  # Track offset of each entry for random access
 
 for i, entry in enumerate(lookup):
@@ -106,9 +125,14 @@ print("Writing gzip compressed file...")
 with gzip.open('/Volumes/UsedGlum/naco/trie_lookup.bin.gz', 'wb', compresslevel=9) as f:
     f.write(binary_data)
 
-# Save offset index for random access (optional - for O(1) access)
+# Save offset index for random access (optional - for O(1) access).
+# The uncompressed copy sits next to trie_lookup.bin because the CLI's
+# mmap fast path reads the pair straight off disk; the gzipped copy is
+# for the web
 print("Writing offset index...")
 offset_data = struct.pack(f'>{len(entry_offsets)}I', *entry_offsets)
+with open('/Volumes/UsedGlum/naco/trie_lookup_offsets.bin', 'wb') as f:
+    f.write(offset_data)
 with gzip.open('/Volumes/UsedGlum/naco/trie_lookup_offsets.bin.gz', 'wb', compresslevel=9) as f:
     f.write(offset_data)
 
@@ -143,13 +167,20 @@ for idx in test_indices:
         if type_byte == 0x00:
             decoded = None
         elif type_byte == 0x01:
-            decoded = decode_int64(binary_data[offset+1:offset+9])
+            decoded = decode_int40(binary_data[offset+1:offset+1+INT_SIZE])
         elif type_byte == 0x02:
             count = binary_data[offset+1]
             decoded = []
+            pos = offset + 2
             for i in range(count):
-                pos = offset + 2 + (i * 8)
-                decoded.append(decode_int64(binary_data[pos:pos+8]))
+                if binary_data[pos] == 0xff:
+                    # String mini-entry: 0xFF marker + length + UTF-8
+                    length = binary_data[pos+1]
+                    decoded.append(binary_data[pos+2:pos+2+length].decode('utf-8'))
+                    pos += 2 + length
+                else:
+                    decoded.append(decode_int40(binary_data[pos:pos+INT_SIZE]))
+                    pos += INT_SIZE
         elif type_byte == 0x03:
             length = binary_data[offset+1]
             decoded = binary_data[offset+2:offset+2+length].decode('utf-8')
@@ -160,4 +191,5 @@ for idx in test_indices:
 print("\n✓ Done! Files created:")
 print("  - /Volumes/UsedGlum/naco/trie_lookup.bin")
 print("  - /Volumes/UsedGlum/naco/trie_lookup.bin.gz (use this for web)")
+print("  - /Volumes/UsedGlum/naco/trie_lookup_offsets.bin (for the CLI mmap path)")
 print("  - /Volumes/UsedGlum/naco/trie_lookup_offsets.bin.gz (use this for web)")
@@ -5,37 +5,90 @@ This is an alternative approach to the trie-based lookup to compare file sizes.
 """
 
 import sys
+import mmap
+import os
+from collections import defaultdict
+from multiprocessing import Pool
 import msgpack
 
 known_prefixes = {'nb':'1', 'nn':'2', 'no':'3', 'nr':'4', 'ns':'5', 'n':'6'}
 
+# Byte markers scanned for directly on the mmap - whole lines are never
+# decoded, only the LCCN and label slices that actually match
+BEGIN_MARKER = b'# BEGIN'
+LABEL_PREDICATE = b'<http://www.loc.gov/mads/rdf/v1#authoritativeLabel>'
+
 # Threshold for corrupt data (from remove_corrupt_lccns.py)
 CORRUPTION_THRESHOLD = 1000000000000  # 1 trillion
 
-count = 0
-label_lookup = {}
-skipped_corrupt = 0
-skipped_dash = 0
+INPUT_PATH = '/Volumes/UsedGlum/naco/names.madsrdf.nt'
+OUTPUT_PATH = '/Volumes/UsedGlum/naco/label_lookup.msgpack'
+
+# Workers parse ~100MB chunks aligned to record boundaries
+CHUNK_SIZE = 100 * 1024 * 1024
+
+
+def find_chunks(path):
+    """
+    Split the file into ~CHUNK_SIZE byte ranges aligned to '# BEGIN'
+    markers so no record ever straddles two chunks.
+    """
+    chunks = []
+
+    with open(path, 'rb') as infile:
+        mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(mm)
+
+        start = mm.find(BEGIN_MARKER)
+        while start != -1:
+            probe = mm.find(BEGIN_MARKER, min(start + CHUNK_SIZE, size))
+            end = size if probe == -1 else probe
+            chunks.append((start, end))
+            start = probe
+
+        mm.close()
+
+    return chunks
 
-print("Opening names.madsrdf.nt...")
-print("Processing lines...\n")
 
-with open('/Volumes/UsedGlum/naco/names.madsrdf.nt') as infile:
-    lccn = None
-    line_count = 0
+def parse_chunk(bounds):
+    """
+    Parse one (start, end) byte range of the NT file.
+    Returns (partial_lookup, count, skipped_corrupt, skipped_dash).
+    """
+    start, end = bounds
 
-    for line in infile:
-        line_count += 1
-        if line_count % 100000 == 0:
-            print(f"Processed {line_count:,} lines, {count:,} labels found, {len(label_lookup):,} unique LCCNs, {skipped_corrupt:,} corrupt, {skipped_dash:,} with dashes")
+    count = 0
+    # Values are always lists here so insertion is a single hash probe;
+    # single-label entries are unwrapped to scalars once at the end
+    label_lookup = defaultdict(list)
+    skipped_corrupt = 0
+    skipped_dash = 0
 
-        if '# BEGIN' in line:
-            lccn = line.split('/')[-1].strip()
+    # mmap the file and jump from record marker to record marker with
+    # bytes.find - lines that don't hold a marker or a label are never
+    # decoded to text, and the kernel pages the file in on demand
+    with open(INPUT_PATH, 'rb') as infile:
+        mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        pos = start
+
+        while pos != -1 and pos < end:
+            line_end = mm.find(b'\n', pos)
+            if line_end == -1:
+                line_end = end
+
+            # The record window runs to the next BEGIN marker
+            next_begin = mm.find(BEGIN_MARKER, line_end, end)
+            record_end = end if next_begin == -1 else next_begin
+
+            # Only the LCCN tail of the BEGIN line is decoded
+            lccn = mm[mm.rfind(b'/', pos, line_end) + 1:line_end].strip().decode('utf-8')
+            pos = next_begin
 
             # Skip indirect geo headings with dashes
             if '-' in lccn:
                 skipped_dash += 1
-                lccn = None
                 continue
 
             # Convert prefix to number
@@ -54,49 +107,99 @@ with open('/Volumes/UsedGlum/naco/names.madsrdf.nt') as infile:
                         lccn = None
                     break
 
-        if lccn and '<http://www.loc.gov/mads/rdf/v1#authoritativeLabel>' in line:
+            if not lccn:
+                continue
+
+            label_pos = mm.find(LABEL_PREDICATE, line_end, record_end)
+            if label_pos == -1:
+                continue
+
+            label_line_end = mm.find(b'\n', label_pos, record_end)
+            if label_line_end == -1:
+                label_line_end = record_end
+
+            quote_start = mm.find(b'> "', label_pos, label_line_end)
+            if quote_start == -1:
+                continue
+
             # Extract label - use raw label without normalization
-            label = line.split('> "')[1].strip()[:-3]
-
-            # Store in lookup: key = LCCN (int), value = label (string)
-            # If duplicate LCCN, store as list
-            if lccn in label_lookup:
-                # Convert to list if needed
-                if not isinstance(label_lookup[lccn], list):
-                    prev_value = label_lookup[lccn]
-                    label_lookup[lccn] = [prev_value]
-                label_lookup[lccn].append(label)
-            else:
-                label_lookup[lccn] = label
+            label = mm[quote_start + 3:label_line_end].strip()[:-3].decode('utf-8')
+
+            # Store in lookup: key = LCCN (int), value = list of labels
+            label_lookup[lccn].append(label)
 
             count += 1
 
-            lccn = None  # Reset for next record
+        mm.close()
 
-print(f"\n{'='*60}")
-print(f"Processing complete!")
-print(f"Total labels processed: {count:,}")
-print(f"Unique LCCNs: {len(label_lookup):,}")
-print(f"Skipped corrupt LCCNs: {skipped_corrupt:,}")
-print(f"Skipped dash LCCNs: {skipped_dash:,}")
-print(f"{'='*60}")
+    return label_lookup, count, skipped_corrupt, skipped_dash
 
-# Write MessagePack file
-output_path = '/Volumes/UsedGlum/naco/label_lookup.msgpack'
-print(f"\nPacking data with MessagePack...")
 
-packed = msgpack.packb(label_lookup, use_bin_type=True)
-packed_size_mb = len(packed) / (1024**2)
-print(f"Packed size: {len(packed):,} bytes ({packed_size_mb:.2f} MB)")
+def merge_partial(label_lookup, partial):
+    """Merge one worker's partial lookup (all values are label lists)."""
+    for lccn, labels in partial.items():
+        label_lookup[lccn].extend(labels)
 
-print(f"Writing to {output_path}...")
-with open(output_path, 'wb') as f:
-    f.write(packed)
 
-import os
-file_size = os.path.getsize(output_path)
-print(f"\n{'='*60}")
-print(f"File written successfully!")
-print(f"Final file size: {file_size:,} bytes ({file_size / (1024**2):.2f} MB)")
-print(f"{'='*60}")
-print("Done!")
+def main():
+    count = 0
+    label_lookup = defaultdict(list)
+    skipped_corrupt = 0
+    skipped_dash = 0
+
+    print("Opening names.madsrdf.nt...")
+    print("Finding chunk boundaries...")
+
+    chunks = find_chunks(INPUT_PATH)
+    workers = os.cpu_count() or 1
+
+    print(f"Parsing {len(chunks)} chunks with {workers} workers...\n")
+
+    # Nothing in the parse depends on order, so chunks fan out across
+    # cores; imap (ordered) keeps the merge deterministic so duplicate
+    # LCCNs accumulate labels in file order
+    with Pool(workers) as pool:
+        for done, (partial, c, corrupt, dash) in enumerate(pool.imap(parse_chunk, chunks), 1):
+            count += c
+            skipped_corrupt += corrupt
+            skipped_dash += dash
+            merge_partial(label_lookup, partial)
+
+            print(f"Chunk {done}/{len(chunks)} merged: {count:,} labels found, {len(label_lookup):,} unique LCCNs, {skipped_corrupt:,} corrupt, {skipped_dash:,} with dashes")
+
+    # The on-disk format keeps the scalar-or-list union, so unwrap
+    # single-label entries in one pass at the end
+    label_lookup = {
+        lccn: labels[0] if len(labels) == 1 else labels
+        for lccn, labels in label_lookup.items()
+    }
+
+    print(f"\n{'='*60}")
+    print(f"Processing complete!")
+    print(f"Total labels processed: {count:,}")
+    print(f"Unique LCCNs: {len(label_lookup):,}")
+    print(f"Skipped corrupt LCCNs: {skipped_corrupt:,}")
+    print(f"Skipped dash LCCNs: {skipped_dash:,}")
+    print(f"{'='*60}")
+
+    # Write MessagePack file
+    print(f"\nPacking data with MessagePack...")
+
+    packed = msgpack.packb(label_lookup, use_bin_type=True)
+    packed_size_mb = len(packed) / (1024**2)
+    print(f"Packed size: {len(packed):,} bytes ({packed_size_mb:.2f} MB)")
+
+    print(f"Writing to {OUTPUT_PATH}...")
+    with open(OUTPUT_PATH, 'wb') as f:
+        f.write(packed)
+
+    file_size = os.path.getsize(OUTPUT_PATH)
+    print(f"\n{'='*60}")
+    print(f"File written successfully!")
+    print(f"Final file size: {file_size:,} bytes ({file_size / (1024**2):.2f} MB)")
+    print(f"{'='*60}")
+    print("Done!")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,10 +4,31 @@ Create MARC21 test files (both Binary and XML formats) from source data.
 Extracts records with 100, 110, 700, or 710 fields for testing.
 """
 
+import copy
 import os
 from pymarc import MARCReader, XMLWriter
 import xml.etree.ElementTree as ET
 
+try:
+    from lxml import etree as LET
+    HAS_LXML = True
+except ImportError:
+    # Falls back to the slower stdlib ElementTree parser
+    LET = None
+    HAS_LXML = False
+
+# MARCXML namespace plumbing - fully qualified tags are compared
+# directly so no per-element namespace resolution happens in the loop
+MARC_NS = 'http://www.loc.gov/MARC21/slim'
+XSI_NS = 'http://www.w3.org/2001/XMLSchema-instance'
+RECORD_TAG = f'{{{MARC_NS}}}record'
+DATAFIELD_TAG = f'{{{MARC_NS}}}datafield'
+SUBFIELD_TAG = f'{{{MARC_NS}}}subfield'
+COLLECTION_TAG = f'{{{MARC_NS}}}collection'
+SCHEMA_LOCATION = ('http://www.loc.gov/MARC21/slim '
+                   'http://www.loc.gov/standards/marcxml/schema/MARC21slim.xsd')
+NAME_TAGS = frozenset(('100', '110', '700', '710'))
+
 # Source files
 BINARY_SOURCE = '/Volumes/Lately/lcmarc/BooksAll.2016.part01.utf8'
 XML_SOURCE = '/Users/m/Downloads/2020445551_2019/Books.All.2019.combined.part01.xml'
@@ -93,120 +114,154 @@ def extract_from_binary(source_file, output_base, max_records=1000):
             out.write(records[0].as_marc())
         print(f"✓ Created: {single_file}")
 
-    # Write multiple records file
+    # Write multiple records file - batch the per-record byte strings
+    # into one buffer and flush in ~4MB chunks so the file is written
+    # in a handful of large syscalls instead of one per record
     if len(records) >= 3:
         multi_file = f"{output_base}_multiple.mrc"
+        buf = bytearray()
         with open(multi_file, 'wb') as out:
             for record in records:  # All records
-                out.write(record.as_marc())
+                buf.extend(record.as_marc())
+                if len(buf) > 4 << 20:
+                    out.write(buf)
+                    buf.clear()
+            if buf:
+                out.write(buf)
         print(f"✓ Created: {multi_file} ({len(records)} records)")
 
     return records
 
 
+def scan_record_element(elem):
+    """
+    Single pass over a record element's datafields.
+    Returns (has_names, name_info, woolf_text) where woolf_text is the
+    100$a value when it contains 'Woolf, Virginia'.
+    """
+    has_names = False
+    name_info = []
+    woolf_text = None
+
+    for datafield in elem:
+        if datafield.tag != DATAFIELD_TAG:
+            continue
+
+        tag = datafield.get('tag')
+        if tag not in NAME_TAGS:
+            continue
+
+        has_names = True
+
+        # Get subfield 'a' for display
+        for subfield in datafield:
+            if subfield.tag == SUBFIELD_TAG and subfield.get('code') == 'a':
+                text = subfield.text
+                if (tag == '100' and woolf_text is None
+                        and text and 'Woolf, Virginia' in text):
+                    woolf_text = text
+                name_info.append(f"{tag}: {text[:50] if text else ''}")
+                break
+
+    return has_names, name_info, woolf_text
+
+
 def extract_from_xml(source_file, output_base, max_records=1000):
     """Extract records from MARCXML file."""
     print(f"Reading MARCXML from: {source_file}")
 
-    # Parse XML incrementally to handle large files with multiple collections
-    ns = {'marc': 'http://www.loc.gov/MARC21/slim'}
     selected_records = []
     woolf_record = None
 
-    # Use iterparse to handle large files
-    context = ET.iterparse(source_file, events=('end',))
+    # lxml's libxml2 parser with a tag filter only surfaces record
+    # elements and is several times faster than stdlib iterparse
+    if HAS_LXML:
+        context = LET.iterparse(source_file, events=('end',),
+                                tag=RECORD_TAG, huge_tree=True)
+    else:
+        context = ET.iterparse(source_file, events=('end',))
 
     for event, elem in context:
-        if elem.tag == '{http://www.loc.gov/MARC21/slim}record':
-            # Check for Woolf in 100 field for single file example
-            if woolf_record is None:
-                for datafield in elem.findall('marc:datafield', ns):
-                    if datafield.get('tag') == '100':
-                        for subfield in datafield.findall('marc:subfield', ns):
-                            if subfield.get('code') == 'a' and subfield.text and 'Woolf, Virginia' in subfield.text:
-                                woolf_record = ET.fromstring(ET.tostring(elem))
-                                print(f"  Found Woolf record for single file example!")
-                                print(f"    100$a: {subfield.text}")
-                                break
-
-            # Check for 100, 110, 700, or 710 fields
-            has_names = False
-            name_info = []
-
-            for datafield in elem.findall('marc:datafield', ns):
-                tag = datafield.get('tag')
-                if tag in ['100', '110', '700', '710']:
-                    has_names = True
-                    # Get subfield 'a' for display
-                    for subfield in datafield.findall('marc:subfield', ns):
-                        if subfield.get('code') == 'a':
-                            name_info.append(f"{tag}: {subfield.text[:50] if subfield.text else ''}")
-                            break
-
-            if has_names:
-                # Store a copy of the element
-                selected_records.append(ET.fromstring(ET.tostring(elem)))
-
-                # Show progress periodically
-                if len(selected_records) % 100 == 0:
-                    print(f"  Collected {len(selected_records)} records...")
-
-                # Show first few records in detail
-                if name_info and len(selected_records) <= 5:
-                    print(f"  Found record #{len(selected_records)}: {', '.join(name_info[:2])}")
-
-                if len(selected_records) >= max_records:
-                    break
-
-            # Clear element to save memory
-            elem.clear()
+        if elem.tag != RECORD_TAG:
+            continue
+
+        # One walk over the datafields covers both the Woolf check and
+        # the name-field scan (the old code did two findall passes)
+        has_names, name_info, woolf_text = scan_record_element(elem)
+
+        # Check for Woolf in 100 field for single file example
+        if woolf_record is None and woolf_text is not None:
+            woolf_record = copy.deepcopy(elem)
+            print(f"  Found Woolf record for single file example!")
+            print(f"    100$a: {woolf_text}")
+
+        if has_names:
+            # deepcopy is C-level under lxml - no tostring/fromstring
+            # round trip to keep the element
+            selected_records.append(copy.deepcopy(elem))
+
+            # Show progress periodically
+            if len(selected_records) % 100 == 0:
+                print(f"  Collected {len(selected_records)} records...")
+
+            # Show first few records in detail
+            if name_info and len(selected_records) <= 5:
+                print(f"  Found record #{len(selected_records)}: {', '.join(name_info[:2])}")
+
+            if len(selected_records) >= max_records:
+                break
+
+        # Clear element to save memory; with lxml also detach it so
+        # cleared husks don't accumulate under the collection root
+        elem.clear()
+        if HAS_LXML:
+            parent = elem.getparent()
+            if parent is not None:
+                parent.remove(elem)
 
     print(f"Collected {len(selected_records)} records with name fields")
 
     # Create new XML collection for single record - use Woolf if found
     if woolf_record:
         single_file = f"{output_base}_single.xml"
-        collection = ET.Element('{http://www.loc.gov/MARC21/slim}collection')
-        collection.set('xmlns', 'http://www.loc.gov/MARC21/slim')
-        collection.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        collection.set('xsi:schemaLocation',
-                      'http://www.loc.gov/MARC21/slim http://www.loc.gov/standards/marcxml/schema/MARC21slim.xsd')
-        collection.append(woolf_record)
-
-        tree = ET.ElementTree(collection)
-        ET.indent(tree, space='  ')
-        tree.write(single_file, encoding='utf-8', xml_declaration=True)
+        write_collection([woolf_record], single_file)
         print(f"✓ Created: {single_file} (Woolf record)")
     elif selected_records:
         single_file = f"{output_base}_single.xml"
-        collection = ET.Element('{http://www.loc.gov/MARC21/slim}collection')
-        collection.set('xmlns', 'http://www.loc.gov/MARC21/slim')
-        collection.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        collection.set('xsi:schemaLocation',
-                      'http://www.loc.gov/MARC21/slim http://www.loc.gov/standards/marcxml/schema/MARC21slim.xsd')
-        collection.append(selected_records[0])
-
-        tree = ET.ElementTree(collection)
-        ET.indent(tree, space='  ')
-        tree.write(single_file, encoding='utf-8', xml_declaration=True)
+        write_collection([selected_records[0]], single_file)
         print(f"✓ Created: {single_file}")
 
     # Create new XML collection for multiple records
     if len(selected_records) >= 3:
         multi_file = f"{output_base}_multiple.xml"
-        collection = ET.Element('{http://www.loc.gov/MARC21/slim}collection')
-        collection.set('xmlns', 'http://www.loc.gov/MARC21/slim')
-        collection.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        collection.set('xsi:schemaLocation',
-                      'http://www.loc.gov/MARC21/slim http://www.loc.gov/standards/marcxml/schema/MARC21slim.xsd')
+        write_collection(selected_records, multi_file)
+        print(f"✓ Created: {multi_file} ({len(selected_records)} records)")
+
 
-        for record in selected_records:  # All records
+def write_collection(records, output_file):
+    """Wrap record elements in a MARC collection and write the file."""
+    if HAS_LXML:
+        collection = LET.Element(COLLECTION_TAG,
+                                 nsmap={None: MARC_NS, 'xsi': XSI_NS})
+        collection.set(f'{{{XSI_NS}}}schemaLocation', SCHEMA_LOCATION)
+
+        for record in records:
+            collection.append(record)
+
+        LET.ElementTree(collection).write(output_file, encoding='utf-8',
+                                          xml_declaration=True, pretty_print=True)
+    else:
+        collection = ET.Element(COLLECTION_TAG)
+        collection.set('xmlns', MARC_NS)
+        collection.set('xmlns:xsi', XSI_NS)
+        collection.set('xsi:schemaLocation', SCHEMA_LOCATION)
+
+        for record in records:
             collection.append(record)
 
         tree = ET.ElementTree(collection)
         ET.indent(tree, space='  ')
-        tree.write(multi_file, encoding='utf-8', xml_declaration=True)
-        print(f"✓ Created: {multi_file} ({len(selected_records)} records)")
+        tree.write(output_file, encoding='utf-8', xml_declaration=True)
 
 
 def main():
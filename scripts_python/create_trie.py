@@ -1,10 +1,15 @@
 import sys
 import math
+import os
 import marisa_trie
 import string
 import unicodedata
 import re
 import pickle
+import mmap
+from array import array
+from collections import defaultdict
+from multiprocessing import Pool
 
 # trie = marisa_trie.Trie()
 
@@ -14,6 +19,41 @@ import pickle
 
 known_prefixes = {'nb':'1', 'nn':'2', 'no':'3', 'nr':'4', 'ns':'5', 'n':'6'}
 
+INPUT_PATH = '/Volumes/UsedGlum/naco/names.madsrdf.nt'
+BEGIN_MARKER = b'# BEGIN'
+
+# Workers parse ~100MB chunks aligned to record boundaries
+CHUNK_SIZE = 100 * 1024 * 1024
+
+# 5-byte lookup slots: the all-ones value marks a slot whose real
+# content lives in the dupes sidecar
+SENTINEL40 = (1 << 40) - 1
+
+# 2-byte prefix table: one dict probe + int() replaces the ordered
+# startswith scan over known_prefixes; bare 'n' falls through last just
+# like the dict insertion order did
+_PREFIX2 = {p.encode(): d.encode() for p, d in known_prefixes.items() if len(p) == 2}
+
+# one alternation covering both line shapes we care about: group 1 is
+# the BEGIN-marker LCCN, groups 2/3 are a label line's subject LCCN and
+# label text. finditer over the mmap'd file is a single C-level scan -
+# the interpreter only resumes on the ~2 matching lines per record and
+# only matched slices ever get decoded
+LINE_RE = re.compile(
+	rb'# BEGIN.*/(\S+)'
+	rb'|<[^>]*/([^/>]+)> <http://www\.loc\.gov/mads/rdf/v1#authoritativeLabel> "(.*)" \.')
+
+# prebuilt translate tables instead of rebuilding them per line. the
+# order matters and has to stay punctuation-strip BEFORE the NFKD fold
+# (the query-side normalize_string helpers promise to match it):
+# compatibility characters whose decomposition yields ASCII punctuation
+# - ellipsis, fullwidth brackets and the like - must keep those dots
+# and marks in the key
+_PUNCT_TABLE = {ord(c): None for c in string.punctuation}
+# after the ascii fold one pass drops spaces and lowercases A-Z
+_FOLD_TABLE = {ord(' '): None}
+_FOLD_TABLE.update({c: c + 32 for c in range(ord('A'), ord('Z') + 1)})
+
 
 def convert_size(size_bytes):
    if size_bytes == 0:
@@ -33,6 +73,10 @@ def is_latin(uchr):
          return latin_letters.setdefault(uchr, 'LATIN' in unicodedata.name(uchr))
 
 def only_roman_chars(unistr):
+    # every ASCII letter is Latin, so the C-level isascii check settles
+    # the dominant case without a per-character generator walk
+    if unistr.isascii():
+        return True
     return all(is_latin(uchr)
            for uchr in unistr
            if uchr.isalpha()) # isalpha suggested by John Machin
@@ -40,98 +84,205 @@ def only_roman_chars(unistr):
 
 
 
-count = 0
-all_keys = []
-all_lccn = []
-all_lccn_prefix = {}
-norm_dupe = {}
-lookup=[]
-with open('/Volumes/UsedGlum/naco/names.madsrdf.nt') as infile:
-
-	for line in infile:
-
-
-		if '# BEGIN' in line:
-			lccn = line.split('/')[-1].strip()
-			if '-' in lccn:
-				# do not use the internal indriect geo headings
-				lccn = "SKIP-SKIP-SKIP"
-
-			for p in known_prefixes:
-				if lccn.startswith(p):
-					lccn_new = lccn.replace(p,known_prefixes[p])
+def find_chunks(path):
+	"""
+	Split the file into ~CHUNK_SIZE byte ranges aligned to '# BEGIN'
+	markers so no record ever straddles two chunks.
+	"""
+	chunks = []
+
+	with open(path, 'rb') as infile:
+		mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+		size = len(mm)
+
+		start = mm.find(BEGIN_MARKER)
+		while start != -1:
+			probe = mm.find(BEGIN_MARKER, min(start + CHUNK_SIZE, size))
+			end = size if probe == -1 else probe
+			chunks.append((start, end))
+			start = probe
+
+		mm.close()
+
+	return chunks
+
+
+def parse_chunk(bounds):
+	"""
+	Parse one (start, end) byte range of the NT file.
+	Returns (partial norm_dupe, label count).
+	"""
+	start, end = bounds
+
+	count = 0
+	# (label, lccn_new) tuples instead of a dict per entry - the dicts
+	# the lookup format needs only exist for dupe buckets and get built
+	# once in the fill pass, which drops two dict allocations per record
+	norm_dupe = defaultdict(list)
+	lccn = None
+	lccn_b = None
+	lccn_new = None
+
+	with open(INPUT_PATH, 'rb') as infile:
+		mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+		for m in LINE_RE.finditer(mm, start, end):
+
+
+			begin_lccn = m.group(1)
+			if begin_lccn is not None:
+				lccn_b = begin_lccn
+				lccn = lccn_b.decode('utf-8')
+				if '-' in lccn:
+					# do not use the internal indriect geo headings
+					lccn_b = None
+					lccn_new = None
+					continue
+
+				# reset per record so an unknown prefix can never
+				# inherit the previous record's converted LCCN
+				lccn_new = None
+				digits = _PREFIX2.get(lccn_b[:2])
+				if digits is not None:
+					rest = lccn_b[2:]
+				elif lccn_b[:1] == b'n':
+					digits = b'6'
+					rest = lccn_b[1:]
+				else:
+					digits = None
+
+				if digits is not None:
 					try:
-						lccn_new = int(lccn_new)
+						lccn_new = int(digits + rest)
 					except:
 						lccn_new = lccn
 
-					break
+				# print("lccn_new",lccn_new)
+				continue
 
-			# print("lccn_new",lccn_new)
-
-
-	
-		if '<http://www.loc.gov/mads/rdf/v1#authoritativeLabel>' in line and lccn in line:
+			if lccn_b is None or m.group(2) != lccn_b:
+				continue
 
 			# TODO Test for non-latin here
-			
-			label = line.split('> "')[1].strip()[:-3]
-			norm = label.translate(str.maketrans('', '', string.punctuation))
-			norm = unicodedata.normalize('NFKD', norm).encode('ascii', 'ignore').decode("utf-8")
-			norm = norm.lower().replace(' ','')
+
+			label = m.group(3).decode('utf-8')
+			norm = label.translate(_PUNCT_TABLE)
+			norm = unicodedata.normalize('NFKD', norm).encode('ascii', 'ignore').decode('ascii')
+			norm = norm.translate(_FOLD_TABLE)
 			norm = ''.join(sorted(norm))
-			lookup.append(None)
 
 			try:
 				s =  re.search(r"[a-z]", norm).start()
 			except:
 				print("No letters:", label, "|", norm)
 				s = 0
-		
+
 			first_part = norm[:s]
 			second_part = norm[s:]
 			norm = second_part + first_part
 
 
-			if norm in norm_dupe:
-				norm_dupe[norm].append({'label': label, 'lccn_new':lccn_new})
-			else:
-				norm_dupe[norm] = [{'label': label, 'lccn_new':lccn_new}]
+			norm_dupe[norm].append((label, lccn_new))
 
 			count=count+1
-			all_keys.append(norm)
-			all_lccn.append(lccn)
-			if count % 500000 == 0:
-				print(count)
-				# print(len(trie), convert_size(sys.getsizeof(trie)))
-				# trie.save('/Volumes/UsedGlum/naco/trie.marisa')
-
-
-				# print(len(lookup), convert_size(sys.getsizeof(lookup)))
-
-
-trie = marisa_trie.Trie(all_keys)
-print('trie length',len(trie))
-trie.save('/Volumes/UsedGlum/naco/trie.marisa')
-
-# for idx, k in enumerate(norm_dupe):
-# 	print(idx,k)
-
-
-for x in trie:
-	pos = trie[x]
-	if len(norm_dupe[x]) == 1:
-		lookup[pos] = norm_dupe[x][0]['lccn_new']
-	else:		
-		lookup[pos] = norm_dupe[x]
-
-with open('/Volumes/UsedGlum/naco/trie_lookup.pickle', 'wb') as handle:
-	pickle.dump(lookup, handle, protocol=pickle.HIGHEST_PROTOCOL)
 
+		mm.close()
+
+	return dict(norm_dupe), count
+
+
+def main():
+	count = 0
+	norm_dupe = defaultdict(list)
+
+	print("Finding chunk boundaries...")
+	chunks = find_chunks(INPUT_PATH)
+	workers = os.cpu_count() or 1
+	print(f"Parsing {len(chunks)} chunks with {workers} workers...")
+
+	# records never straddle a chunk, so the parse fans out across
+	# cores; ordered imap keeps dupe buckets accumulating in file order
+	with Pool(workers) as pool:
+		for done, (partial, c) in enumerate(pool.imap(parse_chunk, chunks), 1):
+			count += c
+			for norm, entries in partial.items():
+				norm_dupe[norm].extend(entries)
+			print(f"chunk {done}/{len(chunks)} merged: {count:,} labels, {len(norm_dupe):,} keys")
+
+	trie = marisa_trie.Trie(norm_dupe.keys())
+	print('trie length',len(trie))
+
+	# one allocation sized to the trie - every fill position is a trie
+	# index, so the old count-sized tail of dead None slots is gone
+	lookup = [None] * len(trie)
+	trie.save('/Volumes/UsedGlum/naco/trie.marisa')
+
+	# for idx, k in enumerate(norm_dupe):
+	# 	print(idx,k)
+
+
+	for x in trie:
+		pos = trie[x]
+		entries = norm_dupe[x]
+		if len(entries) == 1:
+			lookup[pos] = entries[0][1]
+		else:
+			lookup[pos] = [{'label': label, 'lccn_new': lccn_new} for label, lccn_new in entries]
+
+	# the lookup is overwhelmingly single ints: store those as one flat
+	# fixed-width array (the all-ones sentinel marks anything else), and
+	# pickle only the rare dupe-list/string slots in a small sidecar
+	# dict keyed by position. that replaces pickling 11M boxed ints one
+	# object at a time; clients rebuild a slot with flat[pos] and fall
+	# back to dupes.get(pos) when it reads the sentinel. converted
+	# LCCNs top out around 7e10, well under 2**40, so each slot needs
+	# only the low 5 of its 8 little-endian bytes - the strided slice
+	# assignments below drop the zero bytes in 5 C-level copies,
+	# shrinking the file by 3 bytes per entry
+	flat = array('Q', [SENTINEL40]) * len(lookup)
+	dupes = {}
+	for i, v in enumerate(lookup):
+		if type(v) is int and 0 <= v < SENTINEL40:
+			flat[i] = v
+		elif v is not None:
+			dupes[i] = v
+
+	raw = flat.tobytes()
+	packed = bytearray(5 * len(flat))
+	for k in range(5):
+		packed[k::5] = raw[k::8]
+
+	with open('/Volumes/UsedGlum/naco/trie_lookup.int40', 'wb') as handle:
+		handle.write(packed)
+
+	with open('/Volumes/UsedGlum/naco/trie_lookup_dupes.pickle', 'wb') as handle:
+		pickle.dump(dupes, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+	print(len(dupes), 'non-int slots in the dupes sidecar')
+
+
+	# payload-carrying trie for Python consumers: the numeric LCCN
+	# records live inside the trie file itself (val = trie[key],
+	# duplicates become multiple records per key), so no parallel lookup
+	# array, fill pass or pickle round trip is needed on that path. the
+	# plain trie.marisa + lookup pipeline above stays - the web tools
+	# and downstream scripts consume those formats and need the labels
+	# the records can't hold
+	record_pairs = []
+	skipped_non_numeric = 0
+	for norm in norm_dupe:
+		for label, lccn_new in norm_dupe[norm]:
+			if type(lccn_new) is int:
+				record_pairs.append((norm, (lccn_new,)))
+			else:
+				skipped_non_numeric += 1
 
+	record_trie = marisa_trie.RecordTrie('<q', record_pairs)
+	print('record trie length', len(record_trie))
+	if skipped_non_numeric:
+		print(skipped_non_numeric, 'non-numeric lccns left to the pickle lookup only')
+	record_trie.save('/Volumes/UsedGlum/naco/trie.recordtrie')
 
-# print(all_lccn_prefix)
 
-# print(len(lookup), convert_size(sys.getsizeof(lookup)))
-# with open('/Volumes/UsedGlum/naco/dict_names.pickle', 'wb') as handle:
-# 	pickle.dump(lookup, handle, protocol=pickle.HIGHEST_PROTOCOL)
+if __name__ == '__main__':
+	main()
@@ -5,6 +5,18 @@ import json
 import msgpack
 import gzip
 import os
+import re
+import mmap
+from collections import defaultdict
+from multiprocessing import Pool
+
+try:
+	import orjson
+	HAS_ORJSON = True
+except ImportError:
+	# Falls back to the stdlib json encoder
+	orjson = None
+	HAS_ORJSON = False
 
 # trie = marisa_trie.Trie()
 
@@ -14,9 +26,28 @@ import os
 
 known_prefixes = {'nb':'1', 'nn':'2', 'no':'3', 'nr':'4', 'ns':'5', 'n':'6'}
 
+INPUT_PATH = '/Volumes/UsedGlum/naco/names.madsrdf.nt'
+BEGIN_MARKER = b'# BEGIN'
+
+# Workers parse ~100MB chunks aligned to record boundaries
+CHUNK_SIZE = 100 * 1024 * 1024
+
 # Threshold for corrupt data
 CORRUPTION_THRESHOLD = 1000000000000  # 1 trillion
 
+# 2-byte prefix table: one dict probe + int() replaces the ordered
+# startswith scan over known_prefixes; bare 'n' falls through last just
+# like the dict insertion order did
+_PREFIX2 = {p.encode(): d.encode() for p, d in known_prefixes.items() if len(p) == 2}
+
+# one alternation covering both line shapes we care about: group 1 is
+# the BEGIN-marker LCCN, groups 2/3 are a label line's subject LCCN and
+# label text. finditer over the mmap'd byte range is a single C-level
+# scan and only matched slices ever get decoded
+LINE_RE = re.compile(
+	rb'# BEGIN.*/(\S+)'
+	rb'|<[^>]*/([^/>]+)> <http://www\.loc\.gov/mads/rdf/v1#authoritativeLabel> "(.*)" \.')
+
 
 def convert_size(size_bytes):
    if size_bytes == 0:
@@ -30,47 +61,88 @@ def convert_size(size_bytes):
 
 
 
-count = 0
-all_keys = []
-all_lccn = []
-all_lccn_prefix = {}
-label_dupe = {}
-lookup = []
-corrupt_count = 0
-null_count = 0
+def find_chunks(path):
+	"""
+	Split the file into ~CHUNK_SIZE byte ranges aligned to '# BEGIN'
+	markers so no record ever straddles two chunks.
+	"""
+	chunks = []
 
-with open('/Volumes/UsedGlum/naco/names.madsrdf.nt') as infile:
+	with open(path, 'rb') as infile:
+		mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+		size = len(mm)
 
-	for line in infile:
+		start = mm.find(BEGIN_MARKER)
+		while start != -1:
+			probe = mm.find(BEGIN_MARKER, min(start + CHUNK_SIZE, size))
+			end = size if probe == -1 else probe
+			chunks.append((start, end))
+			start = probe
 
+		mm.close()
 
-		if '# BEGIN' in line:
-			lccn = line.split('/')[-1].strip()
-			if '-' in lccn:
-				# do not use the internal indriect geo headings
-				lccn = "SKIP-SKIP-SKIP"
-				lccn_new = None
-			else:
-				lccn_new = None
-				for p in known_prefixes:
-					if lccn.startswith(p):
-						lccn_new = lccn.replace(p,known_prefixes[p])
-						try:
-							lccn_new = int(lccn_new)
-						except:
-							lccn_new = lccn
+	return chunks
+
+
+def parse_chunk(bounds):
+	"""
+	Parse one (start, end) byte range of the NT file.
+	Returns (partial label_dupe, count, null_count, corrupt_count).
+	"""
+	start, end = bounds
 
-						break
+	count = 0
+	# (label, lccn_new) tuples instead of a dict per entry - the dicts
+	# the lookup format needs only exist for dupe buckets and get built
+	# once in the fill pass, which drops two dict allocations per record
+	label_dupe = defaultdict(list)
+	corrupt_count = 0
+	null_count = 0
+	lccn = None
+	lccn_b = None
+	lccn_new = None
 
-			# print("lccn_new",lccn_new)
+	with open(INPUT_PATH, 'rb') as infile:
+		mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
 
+		for m in LINE_RE.finditer(mm, start, end):
 
 
-		if '<http://www.loc.gov/mads/rdf/v1#authoritativeLabel>' in line and lccn in line:
+			begin_lccn = m.group(1)
+			if begin_lccn is not None:
+				lccn_b = begin_lccn
+				lccn = lccn_b.decode('utf-8')
+				if '-' in lccn:
+					# do not use the internal indriect geo headings
+					lccn_b = None
+					lccn_new = None
+					continue
+
+				lccn_new = None
+				digits = _PREFIX2.get(lccn_b[:2])
+				if digits is not None:
+					rest = lccn_b[2:]
+				elif lccn_b[:1] == b'n':
+					digits = b'6'
+					rest = lccn_b[1:]
+				else:
+					digits = None
+
+				if digits is not None:
+					try:
+						lccn_new = int(digits + rest)
+					except:
+						lccn_new = lccn
+
+				# print("lccn_new",lccn_new)
+				continue
+
+			if lccn_b is None or m.group(2) != lccn_b:
+				continue
 
 			# TODO Test for non-latin here
 
-			label = line.split('> "')[1].strip()[:-3]
+			label = m.group(3).decode('utf-8')
 
 			# NO normalization - use the exact original label as the key
 			key = label
@@ -85,111 +157,163 @@ with open('/Volumes/UsedGlum/naco/names.madsrdf.nt') as infile:
 				print(f"Skipping corrupt LCCN: {lccn_new} for label: {label}")
 				continue
 
-			lookup.append(None)
-
 			# Store both the original label and the LCCN
-			if key in label_dupe:
-				label_dupe[key].append({'label': label, 'lccn_new':lccn_new})
-			else:
-				label_dupe[key] = [{'label': label, 'lccn_new':lccn_new}]
+			label_dupe[key].append((label, lccn_new))
 
 			count=count+1
-			all_keys.append(key)
-			all_lccn.append(lccn)
-			if count % 500000 == 0:
-				print(count)
-				# print(len(trie), convert_size(sys.getsizeof(trie)))
-				# trie.save('/Volumes/UsedGlum/naco/trie.marisa')
-
-
-				# print(len(lookup), convert_size(sys.getsizeof(lookup)))
-
-
-print(f"\nSkipped {null_count} null LCCNs")
-print(f"Skipped {corrupt_count} corrupt LCCNs")
-
-trie = marisa_trie.Trie(all_keys)
-print(f'\nTrie length: {len(trie):,}')
-trie.save('/Volumes/UsedGlum/naco/trie_unnormalized.marisa')
-print('Trie saved to: /Volumes/UsedGlum/naco/trie_unnormalized.marisa')
-
-# Gzip compress the trie file for web
-print('Compressing trie file with gzip...')
-with open('/Volumes/UsedGlum/naco/trie_unnormalized.marisa', 'rb') as f:
-	trie_data = f.read()
-trie_compressed = gzip.compress(trie_data, compresslevel=9)
-with open('/Volumes/UsedGlum/naco/trie_unnormalized.marisa.bin', 'wb') as f:
-	f.write(trie_compressed)
-print(f'Trie compressed: {len(trie_data) / 1024 / 1024:.2f} MB -> {len(trie_compressed) / 1024 / 1024:.2f} MB')
-
-# Build lookup array
-# Since we're using exact labels as keys, there should be no duplicates
-duplicate_count = 0
-
-for x in trie:
-	pos = trie[x]
-	if len(label_dupe[x]) == 1:
-		# Single entry - store just the LCCN
-		lookup[pos] = label_dupe[x][0]['lccn_new']
+
+		mm.close()
+
+	return dict(label_dupe), count, null_count, corrupt_count
+
+
+def main():
+	count = 0
+	label_dupe = defaultdict(list)
+	corrupt_count = 0
+	null_count = 0
+
+	print("Finding chunk boundaries...")
+	chunks = find_chunks(INPUT_PATH)
+	workers = os.cpu_count() or 1
+	print(f"Parsing {len(chunks)} chunks with {workers} workers...")
+
+	# records never straddle a chunk, so the parse fans out across cores;
+	# ordered imap keeps dupe buckets accumulating in file order
+	with Pool(workers) as pool:
+		for done, (partial, c, nulls, corrupt) in enumerate(pool.imap(parse_chunk, chunks), 1):
+			count += c
+			null_count += nulls
+			corrupt_count += corrupt
+			for key, entries in partial.items():
+				label_dupe[key].extend(entries)
+			print(f"chunk {done}/{len(chunks)} merged: {count:,} labels, {len(label_dupe):,} keys")
+
+	print(f"\nSkipped {null_count} null LCCNs")
+	print(f"Skipped {corrupt_count} corrupt LCCNs")
+
+	trie = marisa_trie.Trie(label_dupe.keys())
+	print(f'\nTrie length: {len(trie):,}')
+
+	# one allocation sized to the trie - every fill position is a trie
+	# index, so the old count-sized tail of dead None slots is gone
+	lookup = [None] * len(trie)
+	trie.save('/Volumes/UsedGlum/naco/trie_unnormalized.marisa')
+	print('Trie saved to: /Volumes/UsedGlum/naco/trie_unnormalized.marisa')
+
+	# Gzip compress the trie file for web
+	print('Compressing trie file with gzip...')
+	with open('/Volumes/UsedGlum/naco/trie_unnormalized.marisa', 'rb') as f:
+		trie_data = f.read()
+	trie_compressed = gzip.compress(trie_data, compresslevel=9)
+	with open('/Volumes/UsedGlum/naco/trie_unnormalized.marisa.bin', 'wb') as f:
+		f.write(trie_compressed)
+	print(f'Trie compressed: {len(trie_data) / 1024 / 1024:.2f} MB -> {len(trie_compressed) / 1024 / 1024:.2f} MB')
+
+	# Build lookup array
+	# Since we're using exact labels as keys, there should be no duplicates
+	duplicate_count = 0
+
+	for x in trie:
+		pos = trie[x]
+		entries = label_dupe[x]
+		if len(entries) == 1:
+			# Single entry - store just the LCCN
+			lookup[pos] = entries[0][1]
+		else:
+			# Multiple entries (shouldn't happen with exact labels, but handle it)
+			duplicate_count += 1
+			lookup[pos] = [{'label': label, 'lccn_new': lccn_new} for label, lccn_new in entries]
+
+	print(f'\nFound {duplicate_count} duplicate labels (unexpected with exact matching)')
+
+	# payload-carrying trie for Python consumers: the numeric LCCN records
+	# live inside the trie file itself (val = trie[key], duplicates become
+	# multiple records per key), so no parallel lookup array or fill pass
+	# is needed on that path. the plain trie + msgpack lookup pipeline
+	# stays because the web tools consume those formats
+	record_pairs = []
+	skipped_non_numeric = 0
+	for key in label_dupe:
+		for label, lccn_new in label_dupe[key]:
+			if type(lccn_new) is int:
+				record_pairs.append((key, (lccn_new,)))
+			else:
+				skipped_non_numeric += 1
+
+	record_trie = marisa_trie.RecordTrie('<q', record_pairs)
+	print(f'Record trie length: {len(record_trie):,}')
+	if skipped_non_numeric:
+		print(f'{skipped_non_numeric:,} non-numeric LCCNs left to the lookup array only')
+	record_trie.save('/Volumes/UsedGlum/naco/trie_unnormalized.recordtrie')
+	print('Record trie saved to: /Volumes/UsedGlum/naco/trie_unnormalized.recordtrie')
+
+	# Save as JSON - orjson emits UTF-8 bytes in one C-level pass when
+	# installed, which is several times faster than the stdlib encoder
+	# on a list this size
+	print("\nWriting JSON lookup file...")
+	if HAS_ORJSON:
+		with open('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.json', 'wb') as f:
+			f.write(orjson.dumps(lookup))
 	else:
-		# Multiple entries (shouldn't happen with exact labels, but handle it)
-		duplicate_count += 1
-		lookup[pos] = label_dupe[x]
-
-print(f'\nFound {duplicate_count} duplicate labels (unexpected with exact matching)')
-
-# Save as JSON
-print("\nWriting JSON lookup file...")
-with open('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.json', 'w', encoding='utf-8') as f:
-	json.dump(lookup, f, ensure_ascii=False)
-
-json_size = os.path.getsize('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.json')
-print(f"JSON file size: {json_size / 1024 / 1024:.2f} MB")
-
-# MessagePack encode lookup array
-print("\nEncoding lookup to MessagePack format...")
-msgpack_data = msgpack.packb(lookup, use_bin_type=True)
-print(f"Lookup MessagePack size: {len(msgpack_data) / 1024 / 1024:.2f} MB")
-
-# Save uncompressed MessagePack
-print("Writing uncompressed MessagePack file...")
-with open('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack', 'wb') as f:
-	f.write(msgpack_data)
-
-# Gzip compress the MessagePack data
-print("Compressing lookup with gzip...")
-compressed = gzip.compress(msgpack_data, compresslevel=9)
-print(f"Lookup compressed size: {len(compressed) / 1024 / 1024:.2f} MB")
-
-# Save as .bin file (gzipped MessagePack, but using .bin extension for web)
-print("Writing compressed lookup file as .bin...")
-with open('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack.bin', 'wb') as f:
-	f.write(compressed)
-
-# Statistics
-num_ints = sum(1 for x in lookup if isinstance(x, int))
-num_lists = sum(1 for x in lookup if isinstance(x, list))
-num_none = sum(1 for x in lookup if x is None)
-
-print("\n" + "="*70)
-print("RESULTS")
-print("="*70)
-print(f"Total entries:           {len(lookup):,}")
-print(f"Single integers:         {num_ints:,}")
-print(f"Lists (duplicates):      {num_lists:,}")
-print(f"None values:             {num_none:,}")
-print(f"\nOriginal JSON:           {json_size / 1024 / 1024:8.2f} MB")
-print(f"MessagePack:             {len(msgpack_data) / 1024 / 1024:8.2f} MB")
-print(f"MessagePack gzipped:     {len(compressed) / 1024 / 1024:8.2f} MB")
-print(f"\nCompression ratio: {(1 - len(compressed)/json_size)*100:.1f}%")
-print(f"Savings vs JSON: {(json_size - len(compressed)) / 1024 / 1024:.2f} MB")
-print("="*70)
-
-print("\nFiles created:")
-print(f"  /Volumes/UsedGlum/naco/trie_unnormalized.marisa")
-print(f"  /Volumes/UsedGlum/naco/trie_unnormalized.marisa.bin (gzipped, for web)")
-print(f"  /Volumes/UsedGlum/naco/trie_lookup_unnormalized.json")
-print(f"  /Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack")
-print(f"  /Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack.bin (gzipped, for web)")
-
-print("\n✅ Processing complete!")
+		with open('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.json', 'w', encoding='utf-8') as f:
+			json.dump(lookup, f, ensure_ascii=False)
+
+	json_size = os.path.getsize('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.json')
+	print(f"JSON file size: {json_size / 1024 / 1024:.2f} MB")
+
+	# MessagePack encode lookup array - pack entries one at a time and
+	# tee the packed bytes straight into the plain and gzipped outputs
+	# (.bin keeps the gzipped-msgpack layout the web expects), so the
+	# two multi-hundred-MB intermediate buffers never materialize.
+	# mtime=0 keeps repeat builds byte-identical
+	print("\nEncoding lookup to MessagePack format (streaming)...")
+	packer = msgpack.Packer(use_bin_type=True)
+	with open('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack', 'wb') as f, \
+		 gzip.GzipFile('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack.bin', 'wb', compresslevel=9, mtime=0) as gz:
+
+		header = packer.pack_array_header(len(lookup))
+		f.write(header)
+		gz.write(header)
+
+		for v in lookup:
+			buf = packer.pack(v)
+			f.write(buf)
+			gz.write(buf)
+
+	msgpack_size = os.path.getsize('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack')
+	compressed_size = os.path.getsize('/Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack.bin')
+	print(f"Lookup MessagePack size: {msgpack_size / 1024 / 1024:.2f} MB")
+	print(f"Lookup compressed size: {compressed_size / 1024 / 1024:.2f} MB")
+
+	# Statistics
+	num_ints = sum(1 for x in lookup if isinstance(x, int))
+	num_lists = sum(1 for x in lookup if isinstance(x, list))
+	num_none = sum(1 for x in lookup if x is None)
+
+	print("\n" + "="*70)
+	print("RESULTS")
+	print("="*70)
+	print(f"Total entries:           {len(lookup):,}")
+	print(f"Single integers:         {num_ints:,}")
+	print(f"Lists (duplicates):      {num_lists:,}")
+	print(f"None values:             {num_none:,}")
+	print(f"\nOriginal JSON:           {json_size / 1024 / 1024:8.2f} MB")
+	print(f"MessagePack:             {msgpack_size / 1024 / 1024:8.2f} MB")
+	print(f"MessagePack gzipped:     {compressed_size / 1024 / 1024:8.2f} MB")
+	print(f"\nCompression ratio: {(1 - compressed_size/json_size)*100:.1f}%")
+	print(f"Savings vs JSON: {(json_size - compressed_size) / 1024 / 1024:.2f} MB")
+	print("="*70)
+
+	print("\nFiles created:")
+	print(f"  /Volumes/UsedGlum/naco/trie_unnormalized.marisa")
+	print(f"  /Volumes/UsedGlum/naco/trie_unnormalized.marisa.bin (gzipped, for web)")
+	print(f"  /Volumes/UsedGlum/naco/trie_lookup_unnormalized.json")
+	print(f"  /Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack")
+	print(f"  /Volumes/UsedGlum/naco/trie_lookup_unnormalized.msgpack.bin (gzipped, for web)")
+
+	print("\n✅ Processing complete!")
+
+
+if __name__ == '__main__':
+	main()
@@ -7,26 +7,23 @@ with open('/Volumes/UsedGlum/naco/trie_lookup.json', 'r', encoding='utf-8') as f
 
 print(f"Loaded {len(lookup)} entries")
 
-# Process the data
+# Process the data - rewrite in place: only the rare dupe-list entries
+# change, so the millions of int/None slots are never copied into a
+# parallel list or pushed through an isinstance ladder (type identity
+# is enough for concrete JSON-parser types)
 print("Processing entries...")
-processed = []
+num_lists = 0
 
 for i, entry in enumerate(lookup):
     if i % 1000000 == 0 and i > 0:
         print(f"  Processed {i:,} entries...")
 
-    if entry is None:
-        processed.append(None)
-    elif isinstance(entry, int):
-        # Keep integers as-is
-        processed.append(entry)
-    elif isinstance(entry, list):
+    if type(entry) is list:
         # Extract lccn_new values from list of dicts
-        lccn_list = [item['lccn_new'] for item in entry]
-        processed.append(lccn_list)
-    else:
-        # Shouldn't happen, but keep as-is
-        processed.append(entry)
+        lookup[i] = [item['lccn_new'] for item in entry]
+        num_lists += 1
+
+processed = lookup
 
 # Save as JSON
 print("Writing processed JSON file...")
@@ -36,9 +33,8 @@ with open('/Volumes/UsedGlum/naco/trie_lookup_lccn.json', 'w', encoding='utf-8')
 print(f"Done! Processed {len(processed)} entries")
 print("File created at: /Volumes/UsedGlum/naco/trie_lookup_lccn.json")
 
-# Show some statistics
-num_ints = sum(1 for x in processed if isinstance(x, int))
-num_lists = sum(1 for x in processed if isinstance(x, list))
+# Show some statistics (list count was tallied during the rewrite)
+num_ints = sum(1 for x in processed if type(x) is int)
 num_none = sum(1 for x in processed if x is None)
 
 print(f"\nStatistics:")
@@ -1,4 +1,6 @@
 import json
+from array import array
+from bisect import bisect_left
 
 print("Loading JSON file...")
 with open('/Volumes/UsedGlum/naco/trie_lookup_lccn_smaller.json', 'r', encoding='utf-8') as f:
@@ -19,6 +21,20 @@ issues = {
 MAX_NORMAL_LCCN = 100000000000  # 100 billion
 VERY_LARGE_LCCN = 1000000000000  # 1 trillion
 
+# LCCN values collected during the issue pass - array('q') stores raw
+# int64s (8 bytes each, no boxing); the rare corrupt value too big for
+# a signed 64-bit slot goes to a side list
+all_lccns = array('q')
+oversize_lccns = []
+
+
+def collect_lccn(value):
+    try:
+        all_lccns.append(value)
+    except OverflowError:
+        oversize_lccns.append(value)
+
+
 print("Analyzing data quality issues...\n")
 
 for idx, entry in enumerate(lookup):
@@ -32,6 +48,7 @@ for idx, entry in enumerate(lookup):
 
     # Check single integers
     elif isinstance(entry, int):
+        collect_lccn(entry)
         if entry > VERY_LARGE_LCCN:
             issues['very_large'].append({
                 'index': idx,
@@ -61,14 +78,19 @@ for idx, entry in enumerate(lookup):
             if isinstance(item, list) and len(item) >= 2:
                 # Format: [lccn, label]
                 lccn = item[0]
-                if isinstance(lccn, int) and lccn > VERY_LARGE_LCCN:
-                    issues['very_large'].append({
-                        'index': idx,
-                        'value': lccn,
-                        'label': item[1] if len(item) > 1 else None,
-                        'type': 'list_item'
-                    })
+                if isinstance(lccn, int):
+                    collect_lccn(lccn)
+                    if lccn > VERY_LARGE_LCCN:
+                        issues['very_large'].append({
+                            'index': idx,
+                            'value': lccn,
+                            'label': item[1] if len(item) > 1 else None,
+                            'type': 'list_item'
+                        })
             else:
+                # A bare [lccn] still counts toward the value stats
+                if isinstance(item, list) and len(item) >= 1 and isinstance(item[0], int):
+                    collect_lccn(item[0])
                 # Invalid format
                 if len(issues['invalid_format']) < 20:
                     issues['invalid_format'].append({
@@ -125,22 +147,19 @@ print(f"\n" + "="*80)
 print("LCCN VALUE STATISTICS")
 print("="*80)
 
-all_lccns = []
-for entry in lookup:
-    if isinstance(entry, int):
-        all_lccns.append(entry)
-    elif isinstance(entry, list):
-        for item in entry:
-            if isinstance(item, list) and len(item) >= 1:
-                if isinstance(item[0], int):
-                    all_lccns.append(item[0])
+# The values were already collected during the issue pass above, so no
+# second walk over the lookup is needed; one sort gives the order
+# statistics and bisect slices the distribution out of the sorted run
+# instead of six more full sweeps
+if all_lccns or oversize_lccns:
+    ordered = sorted(all_lccns)
+    ordered.extend(sorted(oversize_lccns))
+    total_lccns = len(ordered)
 
-if all_lccns:
-    all_lccns.sort()
-    print(f"Total LCCN values: {len(all_lccns):,}")
-    print(f"Minimum: {all_lccns[0]:,}")
-    print(f"Maximum: {all_lccns[-1]:,}")
-    print(f"Median: {all_lccns[len(all_lccns)//2]:,}")
+    print(f"Total LCCN values: {total_lccns:,}")
+    print(f"Minimum: {ordered[0]:,}")
+    print(f"Maximum: {ordered[-1]:,}")
+    print(f"Median: {ordered[total_lccns//2]:,}")
 
     # Show distribution
     ranges = [
@@ -154,9 +173,10 @@ if all_lccns:
 
     print(f"\nValue distribution:")
     for min_val, max_val, label in ranges:
-        count = sum(1 for x in all_lccns if min_val <= x < max_val)
+        hi = total_lccns if max_val == float('inf') else bisect_left(ordered, max_val)
+        count = hi - bisect_left(ordered, min_val)
         if count > 0:
-            percentage = (count / len(all_lccns)) * 100
+            percentage = (count / total_lccns) * 100
             print(f"  {label:20s}: {count:10,} ({percentage:5.2f}%)")
 
 print("\n" + "="*80)
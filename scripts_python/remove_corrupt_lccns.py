@@ -1,120 +1,212 @@
 import json
+import msgpack
+import gzip
+import os
+import sys
+import time
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    # Falls back to loading the whole JSON file at once
+    ijson = None
+    HAS_IJSON = False
 
 # Threshold for corrupt data
 CORRUPTION_THRESHOLD = 1000000000000  # 1 trillion
 REMOVE_NULLS = True  # Set to True to remove trailing nulls
 
-print("Loading JSON file...")
-with open('/Volumes/UsedGlum/naco/trie_lookup_lccn_smaller.json', 'r', encoding='utf-8') as f:
-    lookup = json.load(f)
-
-print(f"Loaded {len(lookup):,} entries")
-
-# Clean the data
-print("Cleaning corrupt LCCN values and nulls...")
-cleaned = []
-corruption_count = 0
-null_count = 0
-corruption_details = []
-
-for idx, entry in enumerate(lookup):
-    if idx % 1000000 == 0 and idx > 0:
-        print(f"  Processed {idx:,} entries...")
-
-    if entry is None:
-        # Skip nulls if removing them
-        if REMOVE_NULLS:
-            null_count += 1
-            continue
-        else:
-            cleaned.append(None)
-    elif isinstance(entry, int):
-        # Check if single integer is corrupt
-        if entry > CORRUPTION_THRESHOLD:
-            corruption_count += 1
-            corruption_details.append({
-                'index': idx,
-                'value': entry,
-                'type': 'single_int'
-            })
-            # Replace with None
-            cleaned.append(None)
-        else:
-            cleaned.append(entry)
-    elif isinstance(entry, str):
-        # Keep strings as-is (already marked as malformed)
-        cleaned.append(entry)
-    elif isinstance(entry, list):
-        # Clean list entries
-        cleaned_list = []
-        for item in entry:
-            if isinstance(item, list) and len(item) >= 2:
-                lccn = item[0]
-                label = item[1]
-
-                # Check if LCCN is corrupt
-                if isinstance(lccn, int) and lccn > CORRUPTION_THRESHOLD:
+LOOKUP_PATH = '/Volumes/UsedGlum/naco/trie_lookup_lccn_smaller.json'
+MSGPACK_PATH = '/Volumes/UsedGlum/naco/trie_lookup.msgpack'
+BIN_PATH = '/Volumes/UsedGlum/naco/trie_lookup.msgpack.bin'
+# entry count isn't known until the streaming pass finishes, but the
+# msgpack array header has to come first - so the packed entries land in
+# a body file and get stitched behind the header afterwards
+TMP_PATH = MSGPACK_PATH + '.tmp'
+# corruption hits are logged here as they are found, one JSON object
+# per line, instead of piling up in a list that only gets printed once
+REPORT_PATH = '/Volumes/UsedGlum/naco/corruption_report.jsonl'
+
+
+def iter_entries(f):
+    """Yield top-level array entries one at a time."""
+    if HAS_IJSON:
+        yield from ijson.items(f, 'item')
+    else:
+        print("ijson not installed - loading whole JSON file...")
+        yield from json.load(f)
+
+
+def main():
+    # hot names bound as locals: inside a function every lookup in the
+    # per-entry loop is a LOAD_FAST instead of a dict probe on module
+    # globals, which is the cheapest version of this check available
+    # without pulling the whole array into memory
+    threshold = CORRUPTION_THRESHOLD
+    remove_nulls = REMOVE_NULLS
+    # the parser only ever hands back concrete int/str/list, so exact
+    # type identity replaces isinstance and its MRO/ABC machinery
+    _int = int
+    _str = str
+    _list = list
+
+    original_size = os.path.getsize(LOOKUP_PATH)
+
+    # Clean the data in one streaming pass: entries are parsed, cleaned
+    # and written back out one at a time, so neither the input parse
+    # tree nor the cleaned output list ever materializes in memory -
+    # only counters and the corruption details stick around
+    print("Cleaning corrupt LCCN values and nulls (streaming)...")
+    corruption_count = 0
+    null_count = 0
+    total = 0
+    num_ints = 0
+    num_lists = 0
+    num_none = 0
+
+    packer = msgpack.Packer(use_bin_type=True)
+    pack = packer.pack
+
+    # progress goes to stderr as a single rewritten line, throttled to
+    # twice a second - a full print per million entries can stall for
+    # tens of ms behind a slow terminal, which adds up over the run
+    t0 = time.monotonic()
+    last_progress = t0
+
+    with open(LOOKUP_PATH, 'rb') as f, \
+         open(TMP_PATH, 'wb') as out, \
+         open(REPORT_PATH, 'w', encoding='utf-8') as report:
+        write = out.write
+
+        for idx, entry in enumerate(iter_entries(f)):
+            if idx % 1000000 == 0 and idx > 0:
+                now = time.monotonic()
+                if now - last_progress > 0.5:
+                    rate = idx / (now - t0)
+                    sys.stderr.write(f"\r  {idx:,} entries @ {rate:,.0f}/s")
+                    sys.stderr.flush()
+                    last_progress = now
+
+            if entry is None:
+                # Skip nulls if removing them
+                if remove_nulls:
+                    null_count += 1
+                    continue
+                else:
+                    cleaned = None
+            elif type(entry) is _int:
+                # Check if single integer is corrupt
+                if entry > threshold:
                     corruption_count += 1
-                    corruption_details.append({
+                    report.write(json.dumps({
                         'index': idx,
-                        'value': lccn,
-                        'label': label,
-                        'type': 'list_item'
-                    })
-                    # Skip this item (don't add to cleaned list)
+                        'value': entry,
+                        'type': 'single_int'
+                    }) + '\n')
+                    # Replace with None
+                    cleaned = None
                 else:
-                    cleaned_list.append(item)
+                    cleaned = entry
+            elif type(entry) is _str:
+                # Keep strings as-is (already marked as malformed)
+                cleaned = entry
+            elif type(entry) is _list:
+                # Clean list entries: the comprehension filters the
+                # whole list in one C-level pass, and only when it
+                # actually dropped something does the slow loop run
+                # again to record the details - corrupt [lccn, label]
+                # items are rare, so the detail bookkeeping almost
+                # never executes
+                cleaned_list = [item for item in entry
+                                if not (type(item) is _list and len(item) >= 2
+                                        and type(item[0]) is _int
+                                        and item[0] > threshold)]
+
+                if len(cleaned_list) != len(entry):
+                    for item in entry:
+                        if (type(item) is _list and len(item) >= 2
+                                and type(item[0]) is _int
+                                and item[0] > threshold):
+                            corruption_count += 1
+                            report.write(json.dumps({
+                                'index': idx,
+                                'value': item[0],
+                                'label': item[1],
+                                'type': 'list_item'
+                            }, ensure_ascii=False) + '\n')
+
+                # If list is now empty, store None; if only 1 item, extract the LCCN as single int
+                if len(cleaned_list) == 0:
+                    cleaned = None
+                elif len(cleaned_list) == 1:
+                    # Single item - extract just the LCCN number
+                    cleaned = cleaned_list[0][0]
+                else:
+                    cleaned = cleaned_list
             else:
-                # Keep other items as-is
-                cleaned_list.append(item)
-
-        # If list is now empty, store None; if only 1 item, extract the LCCN as single int
-        if len(cleaned_list) == 0:
-            cleaned.append(None)
-        elif len(cleaned_list) == 1:
-            # Single item - extract just the LCCN number
-            cleaned.append(cleaned_list[0][0])
-        else:
-            cleaned.append(cleaned_list)
-    else:
-        # Keep anything else as-is
-        cleaned.append(entry)
+                # Keep anything else as-is
+                cleaned = entry
 
-print(f"\nFound and removed {corruption_count} corrupt LCCN values")
-print(f"Removed {null_count:,} null values")
+            # Tally final statistics here so no pass over the output is
+            # ever needed once it's on disk
+            if cleaned is None:
+                num_none += 1
+            elif type(cleaned) is _int:
+                num_ints += 1
+            elif type(cleaned) is _list:
+                num_lists += 1
 
-print("\nCorrupted entries:")
-for item in corruption_details:
-    if item['type'] == 'single_int':
-        print(f"  Index {item['index']:,}: {item['value']:,} (single int) -> removed")
-    else:
-        print(f"  Index {item['index']:,}: {item['value']:,} (label: \"{item['label']}\") -> removed from list")
+            write(pack(cleaned))
+            total += 1
 
-# Save cleaned data
-print("\nWriting cleaned JSON file...")
-with open('/Volumes/UsedGlum/naco/trie_lookup_lccn_smaller.json', 'w', encoding='utf-8') as f:
-    json.dump(cleaned, f, ensure_ascii=False)
+    elapsed = time.monotonic() - t0
+    sys.stderr.write(f"\r  {total:,} entries cleaned in {elapsed:.1f}s\n")
 
-# Get file size
-import os
-new_size = os.path.getsize('/Volumes/UsedGlum/naco/trie_lookup_lccn_smaller.json')
-original_size = 148.33  # MB from before
-
-print(f"\nDone! Cleaned file saved.")
-print(f"Original size: {original_size:.2f} MB")
-print(f"New size: {new_size / 1024 / 1024:.2f} MB")
-print(f"Savings: {original_size - (new_size / 1024 / 1024):.2f} MB")
-print(f"\nRemoved:")
-print(f"  Corrupt values: {corruption_count}")
-print(f"  Null values: {null_count:,}")
-
-# Statistics
-num_ints = sum(1 for x in cleaned if isinstance(x, int))
-num_lists = sum(1 for x in cleaned if isinstance(x, list))
-num_none = sum(1 for x in cleaned if x is None)
-
-print(f"\nFinal statistics:")
-print(f"  Total entries:    {len(cleaned):,}")
-print(f"  Single integers:  {num_ints:,}")
-print(f"  Lists:            {num_lists:,}")
-print(f"  None values:      {num_none:,}")
+    # Stitch the array header in front of the packed body and tee into
+    # the plain and gzipped outputs - the same gzipped-msgpack layout
+    # search_lccn.py and the web tools already consume (mtime=0 keeps
+    # repeat builds byte-identical)
+    print("Writing MessagePack output...")
+    with open(TMP_PATH, 'rb') as body, \
+         open(MSGPACK_PATH, 'wb') as out, \
+         gzip.GzipFile(BIN_PATH, 'wb', compresslevel=9, mtime=0) as gz:
+
+        header = packer.pack_array_header(total)
+        out.write(header)
+        gz.write(header)
+
+        while True:
+            block = body.read(1 << 20)
+            if not block:
+                break
+            out.write(block)
+            gz.write(block)
+
+    os.remove(TMP_PATH)
+
+    print(f"\nFound and removed {corruption_count} corrupt LCCN values")
+    print(f"Removed {null_count:,} null values")
+    print(f"Corruption details logged to: {REPORT_PATH}")
+
+    msgpack_size = os.path.getsize(MSGPACK_PATH)
+    compressed_size = os.path.getsize(BIN_PATH)
+
+    print(f"\nDone! Cleaned files saved.")
+    print(f"Original JSON size: {original_size / 1024 / 1024:.2f} MB")
+    print(f"MessagePack size: {msgpack_size / 1024 / 1024:.2f} MB")
+    print(f"MessagePack gzipped: {compressed_size / 1024 / 1024:.2f} MB")
+    print(f"Savings vs JSON: {(original_size - compressed_size) / 1024 / 1024:.2f} MB")
+    print(f"\nRemoved:")
+    print(f"  Corrupt values: {corruption_count}")
+    print(f"  Null values: {null_count:,}")
+
+    print(f"\nFinal statistics:")
+    print(f"  Total entries:    {total:,}")
+    print(f"  Single integers:  {num_ints:,}")
+    print(f"  Lists:            {num_lists:,}")
+    print(f"  None values:      {num_none:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,38 +5,179 @@ Search for an LCCN number in the lookup array and return its index position(s).
 
 import msgpack
 import gzip
+import json
+import os
+import socket
+import sys
+from collections import defaultdict
+
+SOCKET_PATH = '/tmp/lccn.sock'
 
 def load_lookup_data(filepath):
     """Load and decompress the MessagePack lookup file."""
+    # stream the gzip through the C-level unpacker instead of the old
+    # read / decompress / unpackb chain, which held the compressed
+    # bytes, the decompressed bytes and the decoded list all at once -
+    # this way only the decoded data is ever fully resident
     print(f"Loading lookup data from {filepath}...")
-    with open(filepath, 'rb') as f:
-        compressed = f.read()
-
-    print("Decompressing...")
-    decompressed = gzip.decompress(compressed)
-
-    print("Decoding MessagePack...")
-    data = msgpack.unpackb(decompressed, strict_map_key=False)
+    with gzip.open(filepath, 'rb') as gz:
+        unpacker = msgpack.Unpacker(gz, strict_map_key=False)
+        data = unpacker.unpack()
 
     print(f"Loaded {len(data):,} entries")
     return data
 
-def search_lccn(lookup_data, target_lccn):
-    """Search for LCCN and return all matching index positions."""
-    matches = []
+def build_index(lookup_data):
+    """Build an inverted index mapping LCCN -> list of positions."""
+    index = defaultdict(list)
 
     for idx, value in enumerate(lookup_data):
-        if value == target_lccn:
-            matches.append(idx)
-        elif isinstance(value, list) and target_lccn in value:
-            matches.append(idx)
+        if type(value) is int:
+            index[value].append(idx)
+        elif type(value) is list:
+            for item in value:
+                # only bare int elements can ever equal an LCCN query
+                # (the [lccn, label] pairs never match `target in value`)
+                if type(item) is int:
+                    positions = index[item]
+                    if not positions or positions[-1] != idx:
+                        positions.append(idx)
+
+    return dict(index)
+
+def load_index(filepath, lookup_data):
+    """
+    Load the persisted inverted index, or build it once and persist it
+    next to the lookup file so later runs skip the O(N) build.
+    """
+    index_path = filepath + '.index'
+
+    if (os.path.exists(index_path)
+            and os.path.getmtime(index_path) >= os.path.getmtime(filepath)):
+        print(f"Loading index from {index_path}...")
+        with open(index_path, 'rb') as f:
+            index = msgpack.unpackb(f.read(), strict_map_key=False)
+        print(f"Index covers {len(index):,} LCCNs")
+        return index
+
+    print("Building LCCN index...")
+    index = build_index(lookup_data)
+    print(f"Index covers {len(index):,} LCCNs")
+
+    with open(index_path, 'wb') as f:
+        f.write(msgpack.packb(index, use_bin_type=True))
+    print(f"Index saved to {index_path}")
+
+    return index
+
+def search_lccn(index, target_lccn):
+    """Search for LCCN and return all matching index positions."""
+    # the inverted index turns the old full-array scan into one dict
+    # probe per query
+    return index.get(target_lccn, [])
+
+def batch_search(index, targets):
+    """
+    Resolve many LCCNs in one go: each target is a single dict probe,
+    so K queries cost K probes instead of K full-array scans.
+    """
+    return {lccn: search_lccn(index, lccn) for lccn in targets}
+
+def serve(filepath):
+    """
+    Load the lookup once and answer newline-delimited LCCN queries over
+    a Unix socket, so clients skip the tens-of-seconds load entirely.
+    """
+    lookup_data = load_lookup_data(filepath)
+    index = load_index(filepath, lookup_data)
+
+    if os.path.exists(SOCKET_PATH):
+        os.remove(SOCKET_PATH)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(SOCKET_PATH)
+    server.listen()
+    print(f"Serving LCCN lookups on {SOCKET_PATH} (ctrl-c to stop)")
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn, conn.makefile('rw', encoding='utf-8') as stream:
+                for line in stream:
+                    line = line.strip()
+                    if not line:
+                        continue
 
-    return matches
+                    try:
+                        lccn = int(line)
+                    except ValueError:
+                        reply = {'error': f"'{line}' is not a valid number"}
+                    else:
+                        matches = search_lccn(index, lccn)
+                        reply = {'matches': [[idx, lookup_data[idx]]
+                                             for idx in matches]}
+
+                    stream.write(json.dumps(reply) + '\n')
+                    stream.flush()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.close()
+        if os.path.exists(SOCKET_PATH):
+            os.remove(SOCKET_PATH)
+
+def query_server(lccn):
+    """Ask a running --serve daemon instead of loading the data here."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(SOCKET_PATH)
+    with client, client.makefile('rw', encoding='utf-8') as stream:
+        stream.write(f"{lccn}\n")
+        stream.flush()
+        return json.loads(stream.readline())
 
 def main():
-    # Load the lookup data
     filepath = '/Volumes/UsedGlum/naco/trie_lookup.msgpack.bin'
-    lookup_data = load_lookup_data(filepath)
+
+    if '--serve' in sys.argv:
+        serve(filepath)
+        return
+
+    if '--batch' in sys.argv:
+        # one LCCN per line in, JSON mapping LCCN -> positions out
+        batch_path = sys.argv[sys.argv.index('--batch') + 1]
+        with open(batch_path, 'r', encoding='utf-8') as f:
+            targets = [int(line) for line in (l.strip() for l in f) if line]
+
+        lookup_data = load_lookup_data(filepath)
+        index = load_index(filepath, lookup_data)
+        print(json.dumps(batch_search(index, targets), indent=2))
+        return
+
+    # a running daemon answers queries in one socket round-trip; only
+    # load the data locally when no server is up. the socket file alone
+    # isn't proof of a live server - a killed daemon leaves it behind -
+    # so probe with a real connect and clear the stale socket if it's
+    # dead
+    use_server = False
+    if os.path.exists(SOCKET_PATH):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(SOCKET_PATH)
+            use_server = True
+        except (ConnectionRefusedError, FileNotFoundError):
+            print(f"Removing stale socket at {SOCKET_PATH}")
+            try:
+                os.remove(SOCKET_PATH)
+            except FileNotFoundError:
+                pass
+        finally:
+            probe.close()
+
+    if use_server:
+        print(f"Using LCCN server at {SOCKET_PATH}")
+    else:
+        lookup_data = load_lookup_data(filepath)
+        index = load_index(filepath, lookup_data)
 
     while True:
         # Get input from user
@@ -54,12 +195,19 @@ def main():
 
         # Search for the LCCN
         print(f"Searching for LCCN {lccn:,}...")
-        matches = search_lccn(lookup_data, lccn)
+        if use_server:
+            reply = query_server(lccn)
+            if 'error' in reply:
+                print(f"Error: {reply['error']}")
+                continue
+            matches = reply['matches']
+        else:
+            matches = [[idx, lookup_data[idx]]
+                       for idx in search_lccn(index, lccn)]
 
         if matches:
             print(f"\nFound {len(matches)} match(es):")
-            for idx in matches:
-                value = lookup_data[idx]
+            for idx, value in matches:
                 print(f"  Index: {idx:,} -> Value: {value}")
         else:
             print(f"LCCN {lccn:,} not found in lookup data")
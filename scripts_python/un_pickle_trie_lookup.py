@@ -1,16 +1,104 @@
 import pickle
 import json
+import msgpack
+import gzip
+import os
+from array import array
 
-# Load the pickle file
-print("Loading pickle file...")
-with open('/Volumes/UsedGlum/naco/trie_lookup.pickle', 'rb') as handle:
-    lookup = pickle.load(handle)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    # Falls back to the stdlib json encoder
+    orjson = None
+    HAS_ORJSON = False
+
+INT40_PATH = '/Volumes/UsedGlum/naco/trie_lookup.int40'
+INT64_PATH = '/Volumes/UsedGlum/naco/trie_lookup.int64'
+DUPES_PATH = '/Volumes/UsedGlum/naco/trie_lookup_dupes.pickle'
+PICKLE_PATH = '/Volumes/UsedGlum/naco/trie_lookup.pickle'
+MSGPACK_PATH = '/Volumes/UsedGlum/naco/trie_lookup.msgpack'
+BIN_PATH = '/Volumes/UsedGlum/naco/trie_lookup.msgpack.bin'
+
+# 5-byte lookup slots: 2**40 - 1 marks a slot that lives in the dupes
+# sidecar instead (matches SENTINEL40 in create_trie.py)
+SENTINEL40 = (1 << 40) - 1
+
+if os.path.exists(INT40_PATH):
+    # packed 5-byte slots written by create_trie.py: re-pad each slot
+    # to 8 little-endian bytes with strided slice assignments (5
+    # C-level copies), then one frombytes rebuilds the int array
+    print("Loading int40 + dupes lookup pair...")
+    with open(INT40_PATH, 'rb') as handle:
+        packed = handle.read()
+    with open(DUPES_PATH, 'rb') as handle:
+        dupes = pickle.load(handle)
+
+    padded = bytearray(len(packed) // 5 * 8)
+    for k in range(5):
+        padded[k::8] = packed[k::5]
+    flat = array('Q')
+    flat.frombytes(bytes(padded))
+
+    lookup = [dupes.get(i) if v == SENTINEL40 else v for i, v in enumerate(flat)]
+elif os.path.exists(INT64_PATH):
+    # int array + dupes sidecar pair written by create_trie.py: one
+    # flat read rebuilds the int slots, -1 slots come from the sidecar
+    print("Loading int64 + dupes lookup pair...")
+    flat = array('q')
+    with open(INT64_PATH, 'rb') as handle:
+        flat.frombytes(handle.read())
+    with open(DUPES_PATH, 'rb') as handle:
+        dupes = pickle.load(handle)
+
+    lookup = [dupes.get(i) if v == -1 else v for i, v in enumerate(flat)]
+else:
+    # Load the pickle file
+    print("Loading pickle file...")
+    with open(PICKLE_PATH, 'rb') as handle:
+        lookup = pickle.load(handle)
 
 print(f"Loaded {len(lookup)} entries")
 
-# Save as JSON
+# Save as JSON - orjson emits UTF-8 bytes in one C-level pass when
+# installed, several times faster than the stdlib encoder on a list
+# this size
 print("Writing JSON file...")
-with open('/Volumes/UsedGlum/naco/trie_lookup.json', 'w', encoding='utf-8') as f:
-    json.dump(lookup, f, ensure_ascii=False)
+if HAS_ORJSON:
+    with open('/Volumes/UsedGlum/naco/trie_lookup.json', 'wb') as f:
+        f.write(orjson.dumps(lookup))
+else:
+    with open('/Volumes/UsedGlum/naco/trie_lookup.json', 'w', encoding='utf-8') as f:
+        json.dump(lookup, f, ensure_ascii=False)
 
 print("Done! JSON file created at: /Volumes/UsedGlum/naco/trie_lookup.json")
+
+# Dump straight to the msgpack pair search_lccn.py and the web tools
+# read, folding in the dict -> [lccn, label] compaction that
+# compact_lookup_format.py applies. The msgpack-bound branch of the
+# pipeline no longer has to take the JSON -> compact -> pack detour;
+# the JSON write above stays only because extract_lccn_array.py and
+# compact_lookup_format.py still consume that file.
+print("Writing MessagePack files...")
+packer = msgpack.Packer(use_bin_type=True)
+with open(MSGPACK_PATH, 'wb') as out, \
+     gzip.GzipFile(BIN_PATH, 'wb', compresslevel=9, mtime=0) as gz:
+
+    header = packer.pack_array_header(len(lookup))
+    out.write(header)
+    gz.write(header)
+
+    for entry in lookup:
+        if type(entry) is list:
+            entry = [[item.get('lccn_new'), item.get('label', '')]
+                     if type(item) is dict else item
+                     for item in entry]
+        buf = packer.pack(entry)
+        out.write(buf)
+        gz.write(buf)
+
+msgpack_size = os.path.getsize(MSGPACK_PATH)
+compressed_size = os.path.getsize(BIN_PATH)
+print(f"MessagePack size: {msgpack_size / 1024 / 1024:.2f} MB")
+print(f"MessagePack gzipped: {compressed_size / 1024 / 1024:.2f} MB")
+print(f"Done! MessagePack files created at: {MSGPACK_PATH} and {BIN_PATH}")